@@ -3,18 +3,50 @@
 # :copyright: (C) 2025 L-ING <hlf01@icloud.com>
 # :license: MIT, see LICENSE for more details.
 
-import json
+import asyncio
+import hashlib
+import os
+import unicodedata
+import warnings
+from collections import deque
+from contextlib import aclosing
 from datetime import UTC, datetime
 from io import BufferedReader
-from typing import IO, Iterable, cast
+from itertools import islice
+from typing import (
+    IO,
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Mapping,
+    Self,
+    TypeVar,
+    cast,
+)
 
-from aiohttp import ClientSession, FormData
+from aiohttp import (
+    ClientConnectionError,
+    ClientConnectorError,
+    ClientPayloadError,
+    ClientResponseError,
+    ClientSession,
+    ClientTimeout,
+    ConnectionTimeoutError,
+    FormData,
+    TCPConnector,
+)
+from dataclasses_json import DataClassJsonMixin
 
+from markji._cache import _TTLCache
 from markji._const import (
     _ACCESS_ROUTE,
     _API_URL,
+    _AUTH_STATUS,
     _CARD_ROUTE,
     _CHAPTER_ROUTE,
+    _CONFLICT_STATUSES,
     _DECK_ROUTE,
     _FILE_ROUTE,
     _FOLDER_ROUTE,
@@ -23,6 +55,7 @@ from markji._const import (
     _MOVE_ROUTE,
     _PROFILE_ROUTE,
     _QUERY_ROUTE,
+    _REBASE_ATTEMPTS,
     _SEARCH_ROUTE,
     _SETTING_ROUTE,
     _SORT_ROUTE,
@@ -30,10 +63,22 @@ from markji._const import (
     _URL_ROUTE,
     _USER_ROUTE,
 )
+from markji._export import _JsonlWriter, _read_state, _write_state
+from markji._json import _dumps, _loads
+from markji._limiter import (
+    _THROTTLE_STATUSES,
+    _parse_retry_after,
+    _RateLimiter,
+)
 from markji._response import _ResponseWrapper
+from markji._state import _StateTracker
+from markji.auth import Auth
+from markji.reconcile import ChapterLayout, DeckPlan, _diff, _validate
+from markji.retry import RetryPolicy
 from markji.types import (
     CardID,
     ChapterID,
+    Datetime,
     DeckAccessSetting,
     DeckAccessSettingBrief,
     DeckAccessSettingInfo,
@@ -80,17 +125,199 @@ __version__ = "0.1.1"
 __license__ = "MIT"
 __copyright__ = f"(C) 2025-{datetime.now(UTC).year} {__author__} <hlf01@icloud.com>"
 
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+# card IDs given as CardID or str, mappings are invariant in their keys
+_K = TypeVar("_K", bound=str)
+
+
+def _consume(task: asyncio.Future):
+    # retrieve the exception of an abandoned task so it is not logged
+    if not task.cancelled():
+        task.exception()
+
+
+def _record(kind: str, parent_id: str | None, data: DataClassJsonMixin) -> dict:
+    # a line of an account export
+    record = data.to_dict()
+    return {"type": kind, "id": record["id"], "parent_id": parent_id, "data": record}
+
+
+def _deleted(kind: str, parent_id: str | None, id: str) -> dict:
+    return {"type": kind, "id": id, "parent_id": parent_id, "data": None}
+
+
+def _content_hash(content: str, grammar_version: int) -> bytes:
+    # line endings and unicode composition do not change a card
+    content = unicodedata.normalize(
+        "NFC", content.replace("\r\n", "\n").replace("\r", "\n")
+    )
+    return hashlib.blake2b(
+        f"{grammar_version}\n{content}".encode(), digest_size=16
+    ).digest()
+
+
+def _utc(time: datetime) -> Datetime:
+    # the server only takes UTC
+    if time.utcoffset() is None:
+        raise ValueError("updated_time 必须包含时区")
+
+    return Datetime.fromisoformat(time.astimezone(UTC).isoformat())
+
+
+def _rebase_order(order: list[str], current: list[str]) -> list[str]:
+    # the intended order of the IDs that still exist, IDs added since then
+    # follow the ID they follow in the current order
+    exists = set(current)
+    result = [id for id in order if id in exists]
+    placed = set(result)
+    for index, id in enumerate(current):
+        if id not in placed:
+            position = result.index(current[index - 1]) + 1 if index > 0 else 0
+            result.insert(position, id)
+            placed.add(id)
+
+    return result
+
+
+async def _iter_pages(
+    fetch: Callable[[int, int], Awaitable[tuple[list[_T], int]]],
+    offset: int,
+    limit: int,
+    max_offset: int,
+    end: int | None = None,
+    count: int | None = None,
+) -> AsyncGenerator[tuple[_T, int, bool], None]:
+    # fetch(offset, limit) returns a page and the total, a page starts at
+    # max_offset at the latest and never reaches past end,
+    # yields each item with the total and whether the total is out of reach
+    def request(offset: int) -> asyncio.Future | None:
+        if offset > max_offset or (end is not None and offset >= end):
+            return None
+
+        size = limit if end is None else min(limit, end - offset)
+        return asyncio.ensure_future(fetch(offset, size))
+
+    # where the last page that may be requested ends
+    last = min(max_offset, end - 1) if end is not None else max_offset
+    reach = offset
+    if offset <= last:
+        reach = offset + (last - offset) // limit * limit
+        reach += limit if end is None else min(limit, end - reach)
+
+    task = request(offset)
+    yielded = 0
+    try:
+        while task is not None:
+            items, total = await task
+            truncated = total > reach
+            offset += limit
+            # fetch the next page while the caller handles this one
+            task = (
+                request(offset)
+                if items
+                and offset < total
+                and (count is None or yielded + len(items) < count)
+                else None
+            )
+            for item in items:
+                if count is not None and yielded >= count:
+                    return
+                yield item, total, truncated
+                yielded += 1
+    finally:
+        # the caller stopped early or a page failed
+        if task is not None:
+            task.cancel()
+            task.add_done_callback(_consume)
+
 
 class Markji:
     """
     客户端
     """
 
-    def __init__(self, token: str):
+    def __init__(
+        self,
+        token: str,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        ttl_dns_cache: int | None = 10,
+        keepalive_timeout: float = 15,
+        total_timeout: float | None = 300,
+        connect_timeout: float | None = None,
+        sock_connect_timeout: float | None = 30,
+        read_timeout: float | None = None,
+        rate_limit: float | None = None,
+        rate_burst: int = 10,
+        retry: RetryPolicy | None = RetryPolicy(),
+        cache_size: int = 0,
+        cache_ttl: float | None = 60,
+        card_cache_size: int = 0,
+        loads: Callable[[str], Any] | None = None,
+        dumps: Callable[[Any], str | bytes] | None = None,
+        auth: Auth | None = None,
+        track_state: bool = False,
+    ):
         """
         客户端
 
+        客户端持有一个长连接会话，所有请求复用连接池中的连接
+
+        使用完毕后调用 close 关闭，或使用 async with 自动关闭
+
+        连接数为 0 时不限制，超时为 None 时不限制
+
+        所有请求共享一个令牌桶限流器，服务器返回 429 或 503 时自动降低速率，
+        并按 Retry-After 暂停所有请求
+
+        同时发起的相同获取请求只发送一次，共享同一个结果
+
+        设置 cache_size 后缓存用户信息、文件夹、卡组、章节和卡片的获取结果，
+        通过本客户端修改对象时自动清除相关缓存，其他客户端的修改在缓存过期前不可见
+
+        设置 card_cache_size 后按卡片ID缓存卡片，只保留见过的最新版本，
+        获取章节的所有卡片时只查询章节中新增或缓存已过期的卡片，
+        通过本客户端创建、编辑的卡片直接更新缓存，其他客户端的编辑在缓存过期前不可见
+
+        失败的请求按重试策略重试，获取类请求和编辑、重命名等幂等请求在结果未知时也会重试，
+        创建、删除、排序、移动等请求仅在确定未被服务器处理时重试，上传文件的请求不会重试
+
+        JSON 默认使用标准库 json，安装 orjson 后自动使用 orjson，也可以传入自定义的 loads 和 dumps
+
+        传入登陆认证后，请求因令牌失效返回 401 时自动重新登陆并重试一次
+
+        设置 track_state 后根据请求结果在本地记录章节和章节集合的修订版本和顺序，
+        创建、排序、移动章节和卡片时不再先获取章节，修订版本过期被服务器拒绝时重新获取并重试一次，
+        其他客户端同时修改同一卡组时新卡片和移动的卡片可能不在末尾
+
+        会话属于创建它的事件循环，在其他事件循环中使用时重新创建会话并关闭原会话，
+        原事件循环已结束时原会话的连接无法释放并发出 ResourceWarning，应在事件循环结束前关闭客户端
+
         :param str token: 用户令牌
+        :param int limit: 最大连接数
+        :param int limit_per_host: 单个主机的最大连接数
+        :param int | None ttl_dns_cache: DNS 缓存时间（秒），None 为永久缓存
+        :param float keepalive_timeout: 空闲连接保持时间（秒）
+        :param float | None total_timeout: 单个请求的总超时（秒）
+        :param float | None connect_timeout: 从连接池获取连接的超时（秒），包含建立连接
+        :param float | None sock_connect_timeout: 建立连接的超时（秒）
+        :param float | None read_timeout: 读取响应数据的超时（秒）
+        :param float | None rate_limit: 每秒最大请求数，None 为不限制
+        :param int rate_burst: 允许的突发请求数
+        :param RetryPolicy | None retry: 重试策略，None 为不重试
+        :param int cache_size: 缓存的最大响应数，0 为不缓存
+        :param float | None cache_ttl: 缓存有效期（秒），None 为永不过期
+        :param int card_cache_size: 缓存的最大卡片数，0 为不缓存
+        :param Callable[[str], Any] | None loads: 解析 JSON 的函数，None 为自动选择
+        :param Callable[[Any], str | bytes] | None dumps: 序列化 JSON 的函数，None 为自动选择
+        :param Auth | None auth: 登陆认证，None 为不自动重新登陆
+        :param bool track_state: 是否在本地记录章节状态
+        :raises ValueError: 连接数错误
+        :raises ValueError: 超时错误
+        :raises ValueError: 限流参数错误
+        :raises ValueError: 缓存参数错误
 
         .. code-block:: python
 
@@ -99,12 +326,333 @@ class Markji:
 
             auth = Auth("username", "password")
             token = await auth.login()
-            client = Markji(token)
-        """
+
+            async with Markji(token) as client:
+                ...
+        """
+        if limit < 0 or limit_per_host < 0:
+            raise ValueError("连接数必须大于等于 0")
+        for timeout in (
+            keepalive_timeout,
+            total_timeout,
+            connect_timeout,
+            sock_connect_timeout,
+            read_timeout,
+        ):
+            if timeout is not None and timeout <= 0:
+                raise ValueError("超时必须大于 0")
+        if rate_limit is not None and rate_limit <= 0:
+            raise ValueError("rate_limit 必须大于 0")
+        if rate_burst < 1:
+            raise ValueError("rate_burst 必须大于等于 1")
+        if cache_size < 0 or card_cache_size < 0:
+            raise ValueError("缓存大小必须大于等于 0")
+        if cache_ttl is not None and cache_ttl <= 0:
+            raise ValueError("cache_ttl 必须大于 0")
+
         self._token = token
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._ttl_dns_cache = ttl_dns_cache
+        self._keepalive_timeout = keepalive_timeout
+        self._timeout = ClientTimeout(
+            total=total_timeout,
+            connect=connect_timeout,
+            sock_connect=sock_connect_timeout,
+            sock_read=read_timeout,
+        )
+        self._limiter = _RateLimiter(rate_limit, rate_burst)
+        self._retry = retry if retry is not None else RetryPolicy(max_attempts=1)
+        self._client_session: ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._closing: set[asyncio.Future] = set()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._cache: _TTLCache[tuple, Any] = _TTLCache(cache_size, cache_ttl)
+        # cards and whether they came from a write of this client
+        self._cards: _TTLCache[str, tuple[Card, bool]] = _TTLCache(
+            card_cache_size, cache_ttl
+        )
+        self._loads = loads if loads is not None else _loads
+        self._dumps = dumps if dumps is not None else _dumps
+        self._auth = auth
+        self._state = _StateTracker(track_state)
+        self._login: asyncio.Future | None = None
+        self._skipped_edits = 0
+        self._root_folder_id: FolderID | None = None
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    async def close(self):
+        """
+        关闭客户端
+
+        关闭会话并释放连接池中的所有连接，之后再次发起请求会重新创建会话，
+        需要在创建会话的事件循环结束前调用
+        """
+        session = self._client_session
+        self._client_session = None
+        self._loop = None
+
+        if session is not None and not session.closed:
+            await session.close()
+
+    def clear_cache(self):
+        """
+        清除缓存
+        """
+        self._cache.clear()
+        self._cards.clear()
+        self._state.clear()
+
+    def skipped_edits(self) -> int:
+        """
+        跳过的编辑数
+
+        :return: 因内容未变化而未发送的编辑卡片请求数
+        :rtype: int
+        """
+        return self._skipped_edits
+
+    def _session(self) -> ClientSession:
+        # a session is bound to the event loop it was created in,
+        # so recreate it when the client is used from another loop
+        loop = asyncio.get_running_loop()
+        session = self._client_session
+        if session is None or session.closed or self._loop is not loop:
+            if session is not None and not session.closed and self._loop is not None:
+                self._close_stale(session, self._loop)
+            session = ClientSession(
+                base_url=_API_URL,
+                connector=TCPConnector(
+                    limit=self._limit,
+                    limit_per_host=self._limit_per_host,
+                    ttl_dns_cache=self._ttl_dns_cache,
+                    keepalive_timeout=self._keepalive_timeout,
+                ),
+                timeout=self._timeout,
+            )
+            self._client_session = session
+            self._loop = loop
+            self._inflight = {}
+            self._login = None
+
+        return session
+
+    def _close_stale(self, session: ClientSession, loop: asyncio.AbstractEventLoop):
+        # connections can only be closed by the loop they belong to,
+        # a closed loop cannot close them any more and the session is only marked closed
+        if loop.is_closed():
+            warnings.warn(
+                "创建会话的事件循环已结束，会话中的连接无法释放，应在事件循环结束前关闭客户端",
+                ResourceWarning,
+                stacklevel=3,
+            )
+            future = asyncio.ensure_future(session.close())
+            self._closing.add(future)
+            future.add_done_callback(self._closing.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
 
-    def _session(self):
-        return ClientSession(base_url=_API_URL, headers={"token": self._token})
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        idempotent: bool | None = None,
+        decode: bool = True,
+        cache: tuple | None = None,
+        invalidate: Iterable[tuple] = (),
+        **kwargs,
+    ) -> Any:
+        # cache: tag of a cacheable read
+        # invalidate: tags of the cached reads a write may change
+        if method != "GET" or not decode or not kwargs.keys() <= {"params"}:
+            try:
+                return await self._send(
+                    method, url, idempotent=idempotent, decode=decode, **kwargs
+                )
+            except BaseException:
+                # the write may have been applied, the tracked state is unknown
+                self._state.invalidate(*invalidate)
+                raise
+            finally:
+                # invalidate even on failure, the write may have been applied
+                # reads issued after a write must not join a read started before it
+                if invalidate:
+                    self._cache.invalidate(*invalidate)
+                    self._cards.invalidate(*invalidate)
+                    self._inflight.clear()
+
+        params = kwargs.get("params") or {}
+        key = (url, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+        if cache is not None:
+            data = self._cache.get(key)
+            if data is not None:
+                return data
+
+        # identical reads in flight share one request,
+        # in-flight requests from another event loop are dropped with the session
+        self._session()
+        inflight = self._inflight
+        task = inflight.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(
+                self._fetch(key, cache, method, url, idempotent=idempotent, **kwargs)
+            )
+            inflight[key] = task
+
+            def _discard(task: asyncio.Future):
+                if inflight.get(key) is task:
+                    del inflight[key]
+
+            task.add_done_callback(_discard)
+
+        # a cancelled caller must not cancel the request shared with others
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self, key: tuple, cache: tuple | None, method: str, url: str, **kwargs
+    ) -> Any:
+        epoch = self._cache.epoch
+        data = await self._send(method, url, **kwargs)
+        # a write finished while fetching, the response may be stale
+        if cache is not None and self._cache.epoch == epoch:
+            self._cache.set(key, data, cache)
+
+        return data
+
+    def _remember_cards(
+        self, deck_id: DeckID | str, cards: Iterable[Card], written: bool = False
+    ):
+        # responses may arrive out of order, never replace a newer revision
+        for card in cards:
+            cached = self._cards.get(card.id)
+            if cached is None or cached[0].revision <= card.revision:
+                self._cards.set(card.id, (card, written), ("card", deck_id, card.id))
+
+    async def _rebase(
+        self,
+        order: list[str],
+        known: _R | None,
+        refresh: Callable[[], Awaitable[tuple[_R, list[str]]]],
+        write: Callable[[list[str], _R], Awaitable[_T]],
+    ) -> _T:
+        # known: the version the order is based on, None to read it first,
+        # refresh returns the current version and IDs
+        if known is None:
+            known, _ = await refresh()
+
+        intended = order
+        for _ in range(_REBASE_ATTEMPTS - 1):
+            try:
+                return await write(order, known)
+            except ClientResponseError as e:
+                if e.status not in _CONFLICT_STATUSES:
+                    raise
+
+                # another writer changed the version in between,
+                # otherwise it was rejected for another reason, e.g. an unknown ID
+                version, current = await refresh()
+                if version == known:
+                    raise
+                known, order = version, _rebase_order(intended, current)
+
+        return await write(order, known)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        *,
+        idempotent: bool | None = None,
+        decode: bool = True,
+        **kwargs,
+    ) -> Any:
+        # GET is idempotent, other methods have to be marked explicitly
+        if idempotent is None:
+            idempotent = method == "GET"
+        # a streamed body can only be sent once
+        replayable = "data" not in kwargs
+        headers = {}
+        # serialize once for all attempts
+        if "json" in kwargs:
+            body = self._dumps(kwargs.pop("json"))
+            kwargs["data"] = body.encode() if isinstance(body, str) else body
+            headers["Content-Type"] = "application/json"
+        relogin = self._auth is not None
+
+        attempt = 0
+        while True:
+            attempt += 1
+            sent = await self._limiter.acquire()
+            # the token may be replaced by a relogin of another request
+            token = self._token
+            headers["token"] = token
+            try:
+                async with self._session().request(
+                    method, url, headers=headers, **kwargs
+                ) as response:
+                    response = _ResponseWrapper(response)
+                    await response.raise_for_status()
+                    self._limiter.success(sent)
+                    if decode:
+                        return await response.json(self._loads)
+                    return
+            except ClientResponseError as e:
+                # a request rejected for its token has not been processed
+                if e.status == _AUTH_STATUS and relogin and replayable:
+                    relogin = False
+                    await self._relogin(token)
+                    attempt -= 1
+                    continue
+
+                if e.status in _THROTTLE_STATUSES:
+                    self._limiter.throttle(sent, _parse_retry_after(e.headers))
+
+                # a request rejected by 429 has not been processed
+                if e.status == 429:
+                    retry = True
+                else:
+                    retry = idempotent and e.status in self._retry.retry_statuses
+                if not retry or not replayable or attempt >= self._retry.max_attempts:
+                    raise
+                # the limiter already waits for the throttle to end
+                if e.status == 429:
+                    continue
+            except (ClientConnectorError, ConnectionTimeoutError):
+                # the request has not been sent
+                if not replayable or attempt >= self._retry.max_attempts:
+                    raise
+            except (ClientConnectionError, ClientPayloadError, asyncio.TimeoutError):
+                # the request may have been processed
+                if (
+                    not idempotent
+                    or not replayable
+                    or attempt >= self._retry.max_attempts
+                ):
+                    raise
+
+            await asyncio.sleep(self._retry._backoff(attempt))
+
+    async def _relogin(self, expired: str):
+        # concurrent requests rejected with the same token share one login
+        if self._token != expired:
+            return
+
+        login = self._login
+        if login is None or login.done():
+            auth = cast(Auth, self._auth)
+            login = asyncio.ensure_future(auth.login(expired))
+            self._login = login
+
+        token = await asyncio.shield(login)
+        if self._token == expired:
+            self._token = token
 
     async def get_profile(self) -> Profile:
         """
@@ -114,11 +662,7 @@ class Markji:
         :rtype: Profile
         :raises aiohttp.ClientResponseError: 获取用户信息失败
         """
-        async with self._session() as session:
-            async with session.get(_PROFILE_ROUTE) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request("GET", _PROFILE_ROUTE, cache=("profile",))
 
         return Profile.from_dict(data["data"]["user"])
 
@@ -131,18 +675,16 @@ class Markji:
         :rtype: list[UserBrief]
         :raises aiohttp.ClientResponseError: 查询用户失败
         """
-        async with self._session() as session:
-            async with session.post(
-                f"{_USER_ROUTE}/{_QUERY_ROUTE}",
-                json=_QueryUsersForm(user_ids).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                users = []
-                for user in data["data"]["users"]:
-                    user = UserBrief.from_dict(user)
-                    users.append(user)
+        data: dict = await self._request(
+            "POST",
+            f"{_USER_ROUTE}/{_QUERY_ROUTE}",
+            json=_QueryUsersForm(user_ids).to_dict(),
+            idempotent=True,
+        )
+        users = []
+        for user in data["data"]["users"]:
+            user = UserBrief.from_dict(user)
+            users.append(user)
 
         return users
 
@@ -173,21 +715,77 @@ class Markji:
         if offset + limit > 10000:
             raise ValueError("offset + limit 必须小于等于 10000")
 
-        async with self._session() as session:
-            async with session.get(
-                f"{_USER_ROUTE}/{_SEARCH_ROUTE}",
-                params={"keyword": nickname, "offset": offset, "limit": limit},
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                users = []
-                for user in data["data"]["users"]:
-                    user = User.from_dict(user)
-                    users.append(user)
+        data: dict = await self._request(
+            "GET",
+            f"{_USER_ROUTE}/{_SEARCH_ROUTE}",
+            params={"keyword": nickname, "offset": offset, "limit": limit},
+        )
+        users = []
+        for user in data["data"]["users"]:
+            user = User.from_dict(user)
+            users.append(user)
 
         return users, data["data"]["total"]
 
+    async def iter_search_users(
+        self,
+        nickname: str,
+        offset: int = 0,
+        limit: int = 100,
+        count: int | None = None,
+    ) -> AsyncGenerator[tuple[User, int, bool], None]:
+        """
+        逐个获取搜索到的用户
+
+        从 offset 开始按 limit 分页搜索，处理当前页时提前获取下一页，
+        获取到 count 个用户后停止，不再获取后面的页
+
+        服务器只允许获取前 10000 个结果，最后一页的 limit 自动缩小，
+        总数大于能获取到的用户数时结果被截断，每个结果都附带是否被截断
+
+        offset 必须大于等于 0，limit 必须大于等于 1
+
+        offset + limit 必须小于等于 10000
+
+        :param str nickname: 用户昵称
+        :param int offset: 偏移
+        :param int limit: 每页的用户数
+        :param int | None count: 最多获取的用户数，None 为不限制
+        :return: 用户, 总数, 是否被截断
+        :rtype: AsyncGenerator[tuple[User, int, bool], None]
+        :raises ValueError: 昵称长度错误
+        :raises ValueError: offset 或 limit 错误
+        :raises ValueError: offset + limit 错误
+        :raises ValueError: count 错误
+        :raises aiohttp.ClientResponseError: 搜索用户失败
+
+        .. code-block:: python
+
+            async for user, _, _ in client.iter_search_users(nickname, count=500):
+                print(user.nickname)
+        """
+        if len(nickname) < 1 or len(nickname) > 8000:
+            raise ValueError("昵称长度必须在 1 到 8000 个字符之间")
+        if offset < 0 or limit < 1:
+            raise ValueError("offset 必须大于等于 0，limit 必须大于等于 1")
+        if offset + limit > 10000:
+            raise ValueError("offset + limit 必须小于等于 10000")
+        if count is not None and count < 1:
+            raise ValueError("count 必须大于等于 1")
+
+        async with aclosing(
+            _iter_pages(
+                lambda offset, limit: self.search_users(nickname, offset, limit),
+                offset,
+                limit,
+                10000,
+                10000,
+                count,
+            )
+        ) as users:
+            async for user, total, truncated in users:
+                yield user, total, truncated
+
     async def search_collaborators(
         self, deck_id: DeckID | str, keyword: str | UserID | int
     ) -> list[Collaborator]:
@@ -207,18 +805,15 @@ class Markji:
             if len(keyword) < 1 or len(keyword) > 8000:
                 raise ValueError("关键词长度必须在 1 到 8000 个字符之间")
 
-        async with self._session() as session:
-            async with session.get(
-                f"{_USER_ROUTE}/{_SEARCH_ROUTE}",
-                params={"collaborated_deck_id": deck_id, "keyword": keyword},
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                collaborators = []
-                for collaborator in data["data"]["users"]:
-                    collaborator = Collaborator.from_dict(collaborator)
-                    collaborators.append(collaborator)
+        data: dict = await self._request(
+            "GET",
+            f"{_USER_ROUTE}/{_SEARCH_ROUTE}",
+            params={"collaborated_deck_id": deck_id, "keyword": keyword},
+        )
+        collaborators = []
+        for collaborator in data["data"]["users"]:
+            collaborator = Collaborator.from_dict(collaborator)
+            collaborators.append(collaborator)
 
         return collaborators
 
@@ -231,17 +826,15 @@ class Markji:
         :rtype: Folder | RootFolder
         :raises aiohttp.ClientResponseError: 获取文件夹失败
         """
-        async with self._session() as session:
-            async with session.get(f"{_FOLDER_ROUTE}/{folder_id}") as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                folder = data["data"]["folder"]
+        data: dict = await self._request(
+            "GET", f"{_FOLDER_ROUTE}/{folder_id}", cache=("folder", folder_id)
+        )
+        folder = data["data"]["folder"]
 
-                if "parent_id" in folder:
-                    return Folder.from_dict(folder)
-                else:
-                    return RootFolder.from_dict(folder)
+        if "parent_id" in folder:
+            return Folder.from_dict(folder)
+        else:
+            return RootFolder.from_dict(folder)
 
     async def get_root_folder(self) -> RootFolder:
         """
@@ -252,14 +845,13 @@ class Markji:
         :raises aiohttp.ClientResponseError: 获取根文件夹失败
         :raises FileNotFoundError: 未找到根文件夹
         """
-        async with self._session() as session:
-            async with session.get(_FOLDER_ROUTE) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                for folder in data["data"]["folders"]:
-                    if "parent_id" not in folder:
-                        return RootFolder.from_dict(folder)
+        data: dict = await self._request("GET", _FOLDER_ROUTE, cache=("folders",))
+        for folder in data["data"]["folders"]:
+            if "parent_id" not in folder:
+                root_folder = RootFolder.from_dict(folder)
+                self._root_folder_id = root_folder.id
+
+                return root_folder
 
         raise FileNotFoundError("未找到根文件夹")
 
@@ -275,18 +867,14 @@ class Markji:
         :rtype: list[Folder]
         :raises aiohttp.ClientResponseError: 获取文件夹列表失败
         """
-        async with self._session() as session:
-            async with session.get(_FOLDER_ROUTE) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                folders = []
-                for folder in data["data"]["folders"]:
-                    # bypass root folder
-                    if "parent_id" not in folder:
-                        continue
-                    folder = Folder.from_dict(folder)
-                    folders.append(folder)
+        data: dict = await self._request("GET", _FOLDER_ROUTE, cache=("folders",))
+        folders = []
+        for folder in data["data"]["folders"]:
+            # bypass root folder
+            if "parent_id" not in folder:
+                continue
+            folder = Folder.from_dict(folder)
+            folders.append(folder)
 
         return folders
 
@@ -305,14 +893,12 @@ class Markji:
         if len(name) < 2 or len(name) > 8:
             raise ValueError("文件夹名必须在 2 到 8 个字符之间")
 
-        async with self._session() as session:
-            async with session.post(
-                _FOLDER_ROUTE,
-                json=_NewFolderForm(name, len(await self.list_folders())).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "POST",
+            _FOLDER_ROUTE,
+            json=_NewFolderForm(name, len(await self.list_folders())).to_dict(),
+            invalidate=[("folders",), ("folder",)],
+        )
 
         return Folder.from_dict(data["data"]["folder"])
 
@@ -325,11 +911,11 @@ class Markji:
         :rtype: RootFolder
         :raises aiohttp.ClientResponseError: 删除文件夹失败
         """
-        async with self._session() as session:
-            async with session.delete(f"{_FOLDER_ROUTE}/{folder_id}") as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "DELETE",
+            f"{_FOLDER_ROUTE}/{folder_id}",
+            invalidate=[("folders",), ("folder",), ("decks", folder_id)],
+        )
 
         return RootFolder.from_dict(data["data"]["parent_folder"])
 
@@ -349,38 +935,68 @@ class Markji:
         if len(name) < 2 or len(name) > 8:
             raise ValueError("文件夹名必须在 2 到 8 个字符之间")
 
-        async with self._session() as session:
-            async with session.post(
-                f"{_FOLDER_ROUTE}/{folder_id}",
-                json=_RenameFolderForm(name).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "POST",
+            f"{_FOLDER_ROUTE}/{folder_id}",
+            json=_RenameFolderForm(name).to_dict(),
+            idempotent=True,
+            invalidate=[("folders",), ("folder", folder_id)],
+        )
 
         return Folder.from_dict(data["data"]["folder"])
 
-    async def sort_folders(self, folder_ids: Iterable[FolderID | str]) -> RootFolder:
+    async def sort_folders(
+        self,
+        folder_ids: Iterable[FolderID | str],
+        updated_time: datetime | None = None,
+        root_folder_id: FolderID | str | None = None,
+    ) -> RootFolder:
         """
         排序文件夹
 
+        传入根文件夹的更新时间，并且传入根文件夹ID或本客户端已获取过根文件夹时，不再先获取根文件夹，
+        其他客户端同时修改根文件夹导致被拒绝时重新获取，按原顺序排列后重试，最多发送 3 次
+
         :param Iterable[FolderID | str] folder_ids: 排序后的文件夹ID列表
+        :param datetime | None updated_time: 已知的根文件夹更新时间，必须包含时区，None 为先获取
+        :param FolderID | str | None root_folder_id: 根文件夹ID，None 为使用本客户端获取过的根文件夹ID
         :return: 排序后的根文件夹
         :rtype: RootFolder
+        :raises ValueError: 更新时间没有时区
         :raises aiohttp.ClientResponseError: 排序文件夹失败
         """
-        root_folder = await self.get_root_folder()
-
-        async with self._session() as session:
-            async with session.post(
-                f"{_FOLDER_ROUTE}/{root_folder.id}/{_SORT_ROUTE}",
-                json=_SortFoldersForm(folder_ids, root_folder.updated_time).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-
-        return RootFolder.from_dict(data["data"]["folder"])
+        folder_ids = [str(folder_id) for folder_id in folder_ids]
+        if updated_time is not None:
+            updated_time = _utc(updated_time)
+        if root_folder_id is None:
+            root_folder_id = self._root_folder_id
+
+        async def refresh() -> tuple[datetime, list[str]]:
+            nonlocal root_folder_id
+            self._cache.invalidate(("folders",))
+            root_folder = await self.get_root_folder()
+            root_folder_id = root_folder.id
+
+            return root_folder.updated_time, [
+                item.object_id for item in root_folder.items
+            ]
+
+        async def write(folder_ids: list[str], updated_time: datetime) -> RootFolder:
+            data: dict = await self._request(
+                "POST",
+                f"{_FOLDER_ROUTE}/{root_folder_id}/{_SORT_ROUTE}",
+                json=_SortFoldersForm(folder_ids, _utc(updated_time)).to_dict(),
+                invalidate=[("folders",), ("folder",)],
+            )
+
+            return RootFolder.from_dict(data["data"]["folder"])
+
+        return await self._rebase(
+            folder_ids,
+            updated_time if root_folder_id is not None else None,
+            refresh,
+            write,
+        )
 
     async def get_deck(self, deck_id: str) -> Deck:
         """
@@ -391,11 +1007,9 @@ class Markji:
         :rtype: Deck
         :raises aiohttp.ClientResponseError: 获取卡组失败
         """
-        async with self._session() as session:
-            async with session.get(f"{_DECK_ROUTE}/{deck_id}") as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "GET", f"{_DECK_ROUTE}/{deck_id}", cache=("deck", deck_id)
+        )
 
         return Deck.from_dict(data["data"]["deck"])
 
@@ -408,17 +1022,16 @@ class Markji:
         :rtype: list[DeckInfo]
         :raises aiohttp.ClientResponseError: 获取卡组列表失败
         """
-        async with self._session() as session:
-            async with session.get(
-                _DECK_ROUTE, params={"folder_id": folder_id}
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                decks = []
-                for deck in data["data"]["decks"]:
-                    deck = DeckInfo.from_dict(deck)
-                    decks.append(deck)
+        data: dict = await self._request(
+            "GET",
+            _DECK_ROUTE,
+            params={"folder_id": folder_id},
+            cache=("decks", folder_id),
+        )
+        decks = []
+        for deck in data["data"]["decks"]:
+            deck = DeckInfo.from_dict(deck)
+            decks.append(deck)
 
         return decks
 
@@ -446,14 +1059,12 @@ class Markji:
         if len(name) < 2 or len(name) > 48:
             raise ValueError("卡组名必须在 2 到 48 个字符之间")
 
-        async with self._session() as session:
-            async with session.post(
-                _DECK_ROUTE,
-                json=_NewDeckForm(name, description, is_private, folder_id).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "POST",
+            _DECK_ROUTE,
+            json=_NewDeckForm(name, description, is_private, folder_id).to_dict(),
+            invalidate=[("folders",), ("folder", folder_id), ("decks", folder_id)],
+        )
 
         return DeckBrief.from_dict(data["data"]["deck"])
 
@@ -466,10 +1077,21 @@ class Markji:
         :param DeckID | str deck_id: 卡组ID
         :raises aiohttp.ClientResponseError: 删除卡组失败
         """
-        async with self._session() as session:
-            async with session.delete(f"{_DECK_ROUTE}/{deck_id}") as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
+        await self._request(
+            "DELETE",
+            f"{_DECK_ROUTE}/{deck_id}",
+            decode=False,
+            invalidate=[
+                ("folders",),
+                ("folder",),
+                ("decks",),
+                ("deck", deck_id),
+                ("chapters", deck_id),
+                ("chapter", deck_id),
+                ("card", deck_id),
+            ],
+        )
+        self._state.invalidate(("chapters", deck_id), ("chapter", deck_id))
 
     async def update_deck_info(
         self,
@@ -513,17 +1135,16 @@ class Markji:
             if card_price < 0:
                 raise ValueError("卡片价格必须大于等于 0")
 
-        async with self._session() as session:
-            async with session.post(
-                f"{_DECK_ROUTE}/{deck_id}",
-                json=_UpdateDeckInfoForm(
-                    name, description, is_private, card_price
-                ).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                deck = DeckBrief.from_dict(data["data"]["deck"])
+        data: dict = await self._request(
+            "POST",
+            f"{_DECK_ROUTE}/{deck_id}",
+            json=_UpdateDeckInfoForm(
+                name, description, is_private, card_price
+            ).to_dict(),
+            idempotent=True,
+            invalidate=[("decks",), ("deck", deck_id)],
+        )
+        deck = DeckBrief.from_dict(data["data"]["deck"])
 
         return deck
 
@@ -643,27 +1264,26 @@ class Markji:
 
         deck = await self.get_deck(deck_id)
 
-        async with self._session() as session:
-            async with session.post(
-                f"{_DECK_ROUTE}/{deck_id}/{_SETTING_ROUTE}/{_ACCESS_ROUTE}",
-                json=_UpdateDeckAccessSettingForm(
-                    deck.is_private,
-                    is_searchable,
-                    validation_request_access,
-                    validation_password,
-                ).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                access_setting = data["data"]["access_setting"]
-
-                if "validation_password" in access_setting:
-                    access_setting = DeckAccessSetting.from_dict(access_setting)
-                elif "validation_request_access" in access_setting:
-                    access_setting = DeckAccessSettingInfo.from_dict(access_setting)
-                else:
-                    access_setting = DeckAccessSettingBrief.from_dict(access_setting)
+        data: dict = await self._request(
+            "POST",
+            f"{_DECK_ROUTE}/{deck_id}/{_SETTING_ROUTE}/{_ACCESS_ROUTE}",
+            json=_UpdateDeckAccessSettingForm(
+                deck.is_private,
+                is_searchable,
+                validation_request_access,
+                validation_password,
+            ).to_dict(),
+            idempotent=True,
+            invalidate=[("decks",), ("deck", deck_id)],
+        )
+        access_setting = data["data"]["access_setting"]
+
+        if "validation_password" in access_setting:
+            access_setting = DeckAccessSetting.from_dict(access_setting)
+        elif "validation_request_access" in access_setting:
+            access_setting = DeckAccessSettingInfo.from_dict(access_setting)
+        else:
+            access_setting = DeckAccessSettingBrief.from_dict(access_setting)
 
         return access_setting
 
@@ -730,29 +1350,46 @@ class Markji:
         return access_setting
 
     async def sort_decks(
-        self, folder_id: FolderID | str, deck_ids: Iterable[DeckID | str]
+        self,
+        folder_id: FolderID | str,
+        deck_ids: Iterable[DeckID | str],
+        updated_time: datetime | None = None,
     ) -> Folder:
         """
         排序卡组
 
+        传入文件夹的更新时间时不再先获取文件夹，
+        其他客户端同时修改文件夹导致被拒绝时重新获取，按原顺序排列后重试，最多发送 3 次
+
         :param FolderID | str folder_id: 文件夹ID
         :param Iterable[DeckID | str] deck_ids: 排序后的卡组ID列表
+        :param datetime | None updated_time: 已知的文件夹更新时间，必须包含时区，None 为先获取
         :return: 排序后的文件夹
         :rtype: Folder
+        :raises ValueError: 更新时间没有时区
         :raises aiohttp.ClientResponseError: 排序卡组失败
         """
-        folder = await self.get_folder(folder_id)
+        deck_ids = [str(deck_id) for deck_id in deck_ids]
+        if updated_time is not None:
+            updated_time = _utc(updated_time)
+
+        async def refresh() -> tuple[datetime, list[str]]:
+            self._cache.invalidate(("folder", folder_id))
+            folder = await self.get_folder(folder_id)
 
-        async with self._session() as session:
-            async with session.post(
+            return folder.updated_time, [item.object_id for item in folder.items]
+
+        async def write(deck_ids: list[str], updated_time: datetime) -> Folder:
+            data: dict = await self._request(
+                "POST",
                 f"{_FOLDER_ROUTE}/{folder_id}/{_SORT_ROUTE}",
-                json=_SortDecksForm(deck_ids, folder.updated_time).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+                json=_SortDecksForm(deck_ids, _utc(updated_time)).to_dict(),
+                invalidate=[("folders",), ("folder", folder_id), ("decks", folder_id)],
+            )
 
-        return Folder.from_dict(data["data"]["folder"])
+            return Folder.from_dict(data["data"]["folder"])
+
+        return await self._rebase(deck_ids, updated_time, refresh, write)
 
     async def move_decks(
         self,
@@ -776,14 +1413,18 @@ class Markji:
         if order is None:
             order = len(await self.list_decks(folder_id_to))
 
-        async with self._session() as session:
-            async with session.post(
-                f"{_FOLDER_ROUTE}/{folder_id_from}/{_MOVE_ROUTE}",
-                json=_MoveDecksForm(deck_ids, folder_id_to, order).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "POST",
+            f"{_FOLDER_ROUTE}/{folder_id_from}/{_MOVE_ROUTE}",
+            json=_MoveDecksForm(deck_ids, folder_id_to, order).to_dict(),
+            invalidate=[
+                ("folders",),
+                ("folder", folder_id_from),
+                ("folder", folder_id_to),
+                ("decks", folder_id_from),
+                ("decks", folder_id_to),
+            ],
+        )
 
         return FolderDiff.from_dict(data["data"])
 
@@ -817,34 +1458,89 @@ class Markji:
         if limit < 1 or limit > 100:
             raise ValueError("limit 必须在 1 到 100 之间")
 
-        async with self._session() as session:
-            params = {
-                "keyword": keyword,
-                "offset": offset,
-                "limit": limit,
-                "debug": "true",
-                "source": "SEARCH",
-            }
+        params = {
+            "keyword": keyword,
+            "offset": offset,
+            "limit": limit,
+            "debug": "true",
+            "source": "SEARCH",
+        }
 
-            if self_only:
-                params["scope"] = _SearchScope.MINE
-            else:
-                params["scope"] = _SearchScope.ALL
-
-            async with session.get(
-                f"{_DECK_ROUTE}/{_SEARCH_ROUTE}",
-                params=params,
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                decks = []
-                for deck in data["data"]["decks"]:
-                    deck = DeckBasic.from_dict(deck)
-                    decks.append(deck)
+        if self_only:
+            params["scope"] = _SearchScope.MINE
+        else:
+            params["scope"] = _SearchScope.ALL
+
+        data: dict = await self._request(
+            "GET", f"{_DECK_ROUTE}/{_SEARCH_ROUTE}", params=params
+        )
+        decks = []
+        for deck in data["data"]["decks"]:
+            deck = DeckBasic.from_dict(deck)
+            decks.append(deck)
 
         return decks, data["data"]["total"]
 
+    async def iter_search_decks(
+        self,
+        keyword: str,
+        offset: int = 0,
+        limit: int = 100,
+        self_only: bool = False,
+        count: int | None = None,
+    ) -> AsyncGenerator[tuple[DeckBasic, int, bool], None]:
+        """
+        逐个获取搜索到的卡组
+
+        从 offset 开始按 limit 分页搜索，处理当前页时提前获取下一页，
+        获取到 count 个卡组后停止，不再获取后面的页
+
+        服务器只允许 offset 在 0 到 1000 之间，从 offset 1000 开始的一页是最后一页，
+        总数大于能获取到的卡组数时结果被截断，每个结果都附带是否被截断
+
+        其他参数见 search_decks
+
+        :param str keyword: 关键词
+        :param int offset: 偏移
+        :param int limit: 每页的卡组数
+        :param bool self_only: 仅自己
+        :param int | None count: 最多获取的卡组数，None 为不限制
+        :return: 卡组基本信息, 总数, 是否被截断
+        :rtype: AsyncGenerator[tuple[DeckBasic, int, bool], None]
+        :raises ValueError: 关键词长度错误
+        :raises ValueError: offset 错误
+        :raises ValueError: limit 错误
+        :raises ValueError: count 错误
+        :raises aiohttp.ClientResponseError: 搜索卡组失败
+
+        .. code-block:: python
+
+            async for deck, _, _ in client.iter_search_decks(keyword, count=200):
+                print(deck.name)
+        """
+        if len(keyword) < 1 or len(keyword) > 8000:
+            raise ValueError("关键词长度必须在 1 到 8000 个字符之间")
+        if offset < 0 or offset > 1000:
+            raise ValueError("offset 必须在 0 到 1000 之间")
+        if limit < 1 or limit > 100:
+            raise ValueError("limit 必须在 1 到 100 之间")
+        if count is not None and count < 1:
+            raise ValueError("count 必须大于等于 1")
+
+        async with aclosing(
+            _iter_pages(
+                lambda offset, limit: self.search_decks(
+                    keyword, offset, limit, self_only
+                ),
+                offset,
+                limit,
+                1000,
+                count=count,
+            )
+        ) as decks:
+            async for deck, total, truncated in decks:
+                yield deck, total, truncated
+
     async def fork_deck(self, deck_id: DeckID | str) -> DeckForked:
         """
         收藏卡组
@@ -856,13 +1552,11 @@ class Markji:
         :rtype: DeckForked
         :raises aiohttp.ClientResponseError: 复制卡组失败
         """
-        async with self._session() as session:
-            async with session.post(
-                f"{_DECK_ROUTE}/{deck_id}/{_FORK_ROUTE}"
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "POST",
+            f"{_DECK_ROUTE}/{deck_id}/{_FORK_ROUTE}",
+            invalidate=[("folders",), ("folder",), ("decks",)],
+        )
 
         return DeckForked.from_dict(data["data"]["deck"])
 
@@ -875,13 +1569,10 @@ class Markji:
         :rtype: str
         :raises aiohttp.ClientResponseError: 获取访问链接失败
         """
-        async with self._session() as session:
-            async with session.get(
-                f"{_DECK_ROUTE}/{deck_id}/{_SETTING_ROUTE}/{_ACCESS_ROUTE}/{_LINK_ROUTE}"
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "GET",
+            f"{_DECK_ROUTE}/{deck_id}/{_SETTING_ROUTE}/{_ACCESS_ROUTE}/{_LINK_ROUTE}",
+        )
 
         return data["data"]["access_link"]
 
@@ -897,15 +1588,15 @@ class Markji:
         :rtype: Chapter
         :raises aiohttp.ClientResponseError: 获取章节失败
         """
-        async with self._session() as session:
-            async with session.get(
-                f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}"
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "GET",
+            f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}",
+            cache=("chapter", deck_id, chapter_id),
+        )
+        chapter = Chapter.from_dict(data["data"]["chapter"])
+        self._state.fold_chapter(deck_id, chapter)
 
-        return Chapter.from_dict(data["data"]["chapter"])
+        return chapter
 
     async def get_chapter_set(self, deck_id: DeckID | str) -> ChapterSet:
         """
@@ -916,15 +1607,15 @@ class Markji:
         :rtype: ChapterSet
         :raises aiohttp.ClientResponseError: 获取章节集合失败
         """
-        async with self._session() as session:
-            async with session.get(
-                f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}"
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "GET",
+            f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}",
+            cache=("chapters", deck_id),
+        )
+        chapter_set = ChapterSet.from_dict(data["data"]["chapterset"])
+        self._state.fold_chapter_set(deck_id, chapter_set)
 
-        return ChapterSet.from_dict(data["data"]["chapterset"])
+        return chapter_set
 
     async def list_chapters(self, deck_id: DeckID | str) -> list[Chapter]:
         """
@@ -935,20 +1626,28 @@ class Markji:
         :rtype: list[Chapter]
         :raises aiohttp.ClientResponseError: 获取章节列表失败
         """
-        async with self._session() as session:
-            async with session.get(
-                f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}"
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                chapters = []
-                for chapter in data["data"]["chapters"]:
-                    chapter = Chapter.from_dict(chapter)
-                    chapters.append(chapter)
+        _, chapters = await self._list_chapters(deck_id)
 
         return chapters
 
+    async def _list_chapters(
+        self, deck_id: DeckID | str
+    ) -> tuple[ChapterSet, list[Chapter]]:
+        data: dict = await self._request(
+            "GET",
+            f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}",
+            cache=("chapters", deck_id),
+        )
+        chapter_set = ChapterSet.from_dict(data["data"]["chapterset"])
+        self._state.fold_chapter_set(deck_id, chapter_set)
+        chapters = []
+        for chapter in data["data"]["chapters"]:
+            chapter = Chapter.from_dict(chapter)
+            self._state.fold_chapter(deck_id, chapter)
+            chapters.append(chapter)
+
+        return chapter_set, chapters
+
     async def new_chapter(self, deck_id: DeckID | str, name: str) -> Chapter:
         """
         创建章节
@@ -966,18 +1665,23 @@ class Markji:
         if len(name) < 1 or len(name) > 48:
             raise ValueError("章节名必须在 1 到 48 个字符之间")
 
-        async with self._session() as session:
-            async with session.post(
-                f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}",
-                json=_NewChapterForm(
-                    name, len(await self.list_chapters(deck_id))
-                ).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        entry = self._state.chapter_set(deck_id)
+        if entry is None:
+            order = len((await self.get_chapter_set(deck_id)).chapter_ids)
+        else:
+            order = len(entry.ids)
+
+        data: dict = await self._request(
+            "POST",
+            f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}",
+            json=_NewChapterForm(name, order).to_dict(),
+            invalidate=[("decks",), ("deck", deck_id), ("chapters", deck_id)],
+        )
+        chapter = Chapter.from_dict(data["data"]["chapter"])
+        self._state.fold_chapter(deck_id, chapter)
+        self._state.insert_chapter(deck_id, chapter.id, order)
 
-        return Chapter.from_dict(data["data"]["chapter"])
+        return chapter
 
     async def delete_chapter(
         self, deck_id: DeckID | str, chapter_id: ChapterID | str
@@ -991,15 +1695,22 @@ class Markji:
         :rtype: ChapterSet
         :raises aiohttp.ClientResponseError: 删除章节失败
         """
-        async with self._session() as session:
-            async with session.delete(
-                f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}"
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "DELETE",
+            f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}",
+            invalidate=[
+                ("decks",),
+                ("deck", deck_id),
+                ("chapters", deck_id),
+                ("chapter", deck_id, chapter_id),
+                ("card", deck_id),
+            ],
+        )
+        chapter_set = ChapterSet.from_dict(data["data"]["chapterset"])
+        self._state.fold_chapter_set(deck_id, chapter_set)
+        self._state.invalidate(("chapter", deck_id, chapter_id))
 
-        return ChapterSet.from_dict(data["data"]["chapterset"])
+        return chapter_set
 
     async def rename_chapter(
         self, deck_id: DeckID | str, chapter_id: ChapterID | str, name: str
@@ -1020,40 +1731,60 @@ class Markji:
         if len(name) < 1 or len(name) > 48:
             raise ValueError("章节名必须在 1 到 48 个字符之间")
 
-        async with self._session() as session:
-            async with session.post(
-                f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}",
-                json=_RenameChapterForm(name).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "POST",
+            f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}",
+            json=_RenameChapterForm(name).to_dict(),
+            idempotent=True,
+            invalidate=[("chapters", deck_id), ("chapter", deck_id, chapter_id)],
+        )
+        chapter = Chapter.from_dict(data["data"]["chapter"])
+        self._state.fold_chapter(deck_id, chapter)
 
-        return Chapter.from_dict(data["data"]["chapter"])
+        return chapter
 
     async def sort_chapters(
-        self, deck_id: DeckID | str, chapter_ids: Iterable[ChapterID | str]
+        self,
+        deck_id: DeckID | str,
+        chapter_ids: Iterable[ChapterID | str],
+        revision: int | None = None,
     ) -> ChapterSet:
         """
         排序章节
 
+        传入或在本地记录了章节集合的修订版本时不再先获取章节集合，
+        其他客户端同时修改章节集合导致被拒绝时重新获取，按原顺序排列后重试，最多发送 3 次
+
         :param DeckID | str deck_id: 卡组ID
         :param Iterable[ChapterID | str] chapter_ids: 排序后的章节ID列表
+        :param int | None revision: 已知的章节集合修订版本，None 为使用记录的版本或先获取
         :return: 排序后的章节集合
         :rtype: ChapterSet
         :raises aiohttp.ClientResponseError: 排序章节失败
         """
-        chapter_set = await self.get_chapter_set(deck_id)
-        async with self._session() as session:
-            async with session.post(
+        chapter_ids = [str(chapter_id) for chapter_id in chapter_ids]
+        if revision is None:
+            revision = self._state.chapter_set_revision(deck_id)
+
+        async def refresh() -> tuple[int, list[str]]:
+            self._cache.invalidate(("chapters", deck_id))
+            chapter_set = await self.get_chapter_set(deck_id)
+
+            return chapter_set.revision, list(chapter_set.chapter_ids)
+
+        async def write(chapter_ids: list[str], revision: int) -> ChapterSet:
+            data: dict = await self._request(
+                "POST",
                 f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{_SORT_ROUTE}",
-                json=_SortChaptersForm(chapter_ids, chapter_set.revision).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+                json=_SortChaptersForm(chapter_ids, revision).to_dict(),
+                invalidate=[("chapters", deck_id)],
+            )
+            chapter_set = ChapterSet.from_dict(data["data"]["chapterset"])
+            self._state.fold_chapter_set(deck_id, chapter_set)
+
+            return chapter_set
 
-        return ChapterSet.from_dict(data["data"]["chapterset"])
+        return await self._rebase(chapter_ids, revision, refresh, write)
 
     async def get_card(self, deck_id: DeckID | str, card_id: str) -> Card:
         """
@@ -1065,44 +1796,208 @@ class Markji:
         :rtype: Card
         :raises aiohttp.ClientResponseError: 获取卡片失败
         """
-        async with self._session() as session:
-            async with session.get(
-                f"{_DECK_ROUTE}/{deck_id}/{_CARD_ROUTE}/{card_id}"
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "GET",
+            f"{_DECK_ROUTE}/{deck_id}/{_CARD_ROUTE}/{card_id}",
+            cache=("card", deck_id, card_id),
+        )
+        card = Card.from_dict(data["data"]["card"])
+        self._remember_cards(deck_id, [card])
 
-        return Card.from_dict(data["data"]["card"])
+        return card
 
     async def list_cards(
-        self, deck_id: DeckID | str, chapter_id: ChapterID | str
+        self,
+        deck_id: DeckID | str,
+        chapter_id: ChapterID | str,
+        chunk_size: int = 500,
+        concurrency: int = 4,
     ) -> list[Card]:
         """
         获取章节的所有卡片
 
+        卡片ID按 chunk_size 分批查询，同时进行的查询不超过 concurrency 个
+
+        启用卡片缓存时只查询缓存中没有的卡片
+
         :param DeckID | str deck_id: 卡组ID
         :param ChapterID | str chapter_id: 章节ID
+        :param int chunk_size: 每次查询的卡片数
+        :param int concurrency: 最大并发数
         :return: 卡片列表
         :rtype: list[Card]
+        :raises ValueError: 分批参数错误
         :raises aiohttp.ClientResponseError: 获取卡片列表失败
         """
+        return [
+            card
+            async for card in self.iter_cards(
+                deck_id, chapter_id, chunk_size, concurrency
+            )
+        ]
+
+    async def iter_cards(
+        self,
+        deck_id: DeckID | str,
+        chapter_id: ChapterID | str,
+        chunk_size: int = 500,
+        concurrency: int = 4,
+    ) -> AsyncGenerator[Card, None]:
+        """
+        逐个获取章节的所有卡片
+
+        卡片ID按 chunk_size 分批查询，最多提前查询 concurrency 批，
+        按章节中的顺序返回卡片，每批查询完成后即可获取其中的卡片
+
+        :param DeckID | str deck_id: 卡组ID
+        :param ChapterID | str chapter_id: 章节ID
+        :param int chunk_size: 每次查询的卡片数
+        :param int concurrency: 最大并发数
+        :return: 卡片
+        :rtype: AsyncGenerator[Card, None]
+        :raises ValueError: 分批参数错误
+        :raises aiohttp.ClientResponseError: 获取卡片失败
+
+        .. code-block:: python
+
+            async for card in client.iter_cards(deck_id, chapter_id):
+                print(card.content)
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须大于等于 1")
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+
         chapter = await self.get_chapter(deck_id, chapter_id)
-        if len(chapter.card_ids) == 0:
-            return []
+        # close the pages with the caller, not when collected
+        async with aclosing(
+            self._iter_cards(
+                deck_id,
+                ((None, card_id) for card_id in chapter.card_ids),
+                chunk_size,
+                concurrency,
+            )
+        ) as cards:
+            async for _, card in cards:
+                yield card
+
+    async def iter_deck_cards(
+        self,
+        deck_id: DeckID | str,
+        chunk_size: int = 500,
+        concurrency: int = 4,
+    ) -> AsyncGenerator[tuple[Chapter, Card], None]:
+        """
+        逐个获取卡组的所有卡片
+
+        只获取一次章节列表，所有章节的卡片ID按 chunk_size 分批查询，
+        一批可以包含多个章节的卡片，最多提前查询 concurrency 批，
+        按章节顺序和章节中卡片的顺序返回
+
+        :param DeckID | str deck_id: 卡组ID
+        :param int chunk_size: 每次查询的卡片数
+        :param int concurrency: 最大并发数
+        :return: 章节, 卡片
+        :rtype: AsyncGenerator[tuple[Chapter, Card], None]
+        :raises ValueError: 分批参数错误
+        :raises aiohttp.ClientResponseError: 获取卡片失败
 
-        async with self._session() as session:
-            async with session.post(
+        .. code-block:: python
+
+            async for chapter, card in client.iter_deck_cards(deck_id):
+                print(chapter.name, card.content)
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须大于等于 1")
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+
+        chapter_set, chapters = await self._list_chapters(deck_id)
+        # in the order of the chapter set
+        chapter_map = {chapter.id: chapter for chapter in chapters}
+        chapters = [
+            chapter_map[chapter_id]
+            for chapter_id in chapter_set.chapter_ids
+            if chapter_id in chapter_map
+        ]
+
+        async with aclosing(
+            self._iter_cards(
+                deck_id,
+                (
+                    (chapter, card_id)
+                    for chapter in chapters
+                    for card_id in chapter.card_ids
+                ),
+                chunk_size,
+                concurrency,
+            )
+        ) as cards:
+            async for chapter, card in cards:
+                yield chapter, card
+
+    async def _iter_cards(
+        self,
+        deck_id: DeckID | str,
+        items: Iterable[tuple[_T, CardID]],
+        chunk_size: int,
+        concurrency: int,
+    ) -> AsyncGenerator[tuple[_T, Card], None]:
+        # items: card IDs in order, each with a label passed through
+        items = iter(items)
+        pending: deque[
+            tuple[list[tuple[_T, CardID]], asyncio.Future[dict[str, Card]]]
+        ] = deque()
+
+        def prefetch():
+            chunk = list(islice(items, chunk_size))
+            if chunk:
+                task = asyncio.ensure_future(
+                    self._query_cards(deck_id, [card_id for _, card_id in chunk])
+                )
+                pending.append((chunk, task))
+
+        for _ in range(concurrency):
+            prefetch()
+
+        try:
+            while pending:
+                chunk, task = pending.popleft()
+                cards = await task
+                prefetch()
+                for label, card_id in chunk:
+                    # deleted since the chapter was read
+                    if card_id in cards:
+                        yield label, cards[card_id]
+        finally:
+            # the caller stopped early or a chunk failed
+            for _, task in pending:
+                task.cancel()
+                task.add_done_callback(_consume)
+
+    async def _query_cards(
+        self, deck_id: DeckID | str, card_ids: list[CardID]
+    ) -> dict[str, Card]:
+        cards: dict[str, Card] = {}
+        missing = []
+        for card_id in card_ids:
+            cached = self._cards.get(card_id)
+            if cached is None:
+                missing.append(card_id)
+            else:
+                cards[card_id] = cached[0]
+
+        if missing:
+            data: dict = await self._request(
+                "POST",
                 f"{_DECK_ROUTE}/{deck_id}/{_CARD_ROUTE}/{_QUERY_ROUTE}",
-                json=_ListCardsForm(chapter.card_ids).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                cards = []
-                for card in data["data"]["cards"]:
-                    card = Card.from_dict(card)
-                    cards.append(card)
+                json=_ListCardsForm(missing).to_dict(),
+                idempotent=True,
+            )
+            fetched = [Card.from_dict(card) for card in data["data"]["cards"]]
+            self._remember_cards(deck_id, fetched)
+            for card in fetched:
+                cards[card.id] = card
 
         return cards
 
@@ -1130,19 +2025,116 @@ class Markji:
         if len(content) < 1 or len(content) > 2500:
             raise ValueError("卡片内容必须在 1 到 2500 个字符之间")
 
-        async with self._session() as session:
-            async with session.post(
-                f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}/{_CARD_ROUTE}",
-                json=_NewCardForm(
-                    len(await self.list_cards(deck_id, chapter_id)),
-                    _ContentInfo(content, grammar_version),
-                ).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        order = await self._card_count(deck_id, chapter_id)
+
+        return await self._new_card(
+            deck_id, chapter_id, content, grammar_version, order
+        )
+
+    async def new_cards(
+        self,
+        deck_id: DeckID | str,
+        chapter_id: ChapterID | str,
+        contents: Iterable[str],
+        grammar_version: int = 3,
+        concurrency: int = 10,
+    ) -> tuple[list[Card | BaseException], BaseException | None]:
+        """
+        批量创建卡片
+
+        卡片按内容顺序添加到章节末尾，同时创建的卡片数不超过 concurrency
+
+        同时创建的卡片可能乱序，创建后重新获取章节并排序，concurrency 为 1 时不需要，
+        排序失败时卡片已创建，仍返回创建结果
+
+        卡片内容长度必须在 1 到 2500 个字符之间
+
+        :param DeckID | str deck_id: 卡组ID
+        :param ChapterID | str chapter_id: 章节ID
+        :param Iterable[str] contents: 卡片内容列表
+        :param int grammar_version: 语法版本
+        :param int concurrency: 最大并发数
+        :return: 与内容顺序相同的列表，创建失败的位置为对应的异常；排序失败时的异常
+        :rtype: tuple[list[Card | BaseException], BaseException | None]
+        :raises ValueError: 并发数错误
+        :raises aiohttp.ClientResponseError: 获取章节失败
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+
+        contents = list(contents)
+        base = await self._card_count(deck_id, chapter_id)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def create(index: int, content: str) -> Card:
+            if len(content) < 1 or len(content) > 2500:
+                raise ValueError("卡片内容必须在 1 到 2500 个字符之间")
+
+            async with semaphore:
+                return await self._new_card(
+                    deck_id, chapter_id, content, grammar_version, base + index
+                )
+
+        results: list[Card | BaseException] = await asyncio.gather(
+            *(create(index, content) for index, content in enumerate(contents)),
+            return_exceptions=True,
+        )
+
+        # cards created concurrently may land out of order, put them back,
+        # the cards exist whether or not this succeeds
+        created = [card.id for card in results if isinstance(card, Card)]
+        if len(created) < 2 or concurrency == 1:
+            return results, None
+
+        try:
+            chapter = await self.get_chapter(deck_id, chapter_id)
+            ours = set(created)
+            ordered = iter(created)
+            card_ids = [
+                next(ordered) if card_id in ours else card_id
+                for card_id in chapter.card_ids
+            ]
+            if card_ids != chapter.card_ids:
+                await self.sort_cards(deck_id, chapter_id, card_ids, chapter.revision)
+        except Exception as e:
+            return results, e
+
+        return results, None
+
+    async def _new_card(
+        self,
+        deck_id: DeckID | str,
+        chapter_id: ChapterID | str,
+        content: str,
+        grammar_version: int,
+        order: int,
+    ) -> Card:
+        data: dict = await self._request(
+            "POST",
+            f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}/{_CARD_ROUTE}",
+            json=_NewCardForm(order, _ContentInfo(content, grammar_version)).to_dict(),
+            invalidate=[
+                ("decks",),
+                ("deck", deck_id),
+                ("chapters", deck_id),
+                ("chapter", deck_id, chapter_id),
+            ],
+        )
+
+        card = Card.from_dict(data["data"]["card"])
+        self._remember_cards(deck_id, [card], written=True)
+        self._state.insert_card(deck_id, chapter_id, card.id, order)
+
+        return card
+
+    async def _card_count(
+        self, deck_id: DeckID | str, chapter_id: ChapterID | str
+    ) -> int:
+        entry = self._state.chapter(deck_id, chapter_id)
+        if entry is None:
+            return len((await self.get_chapter(deck_id, chapter_id)).card_ids)
 
-        return Card.from_dict(data["data"]["card"])
+        return len(entry.ids)
 
     async def delete_card(
         self, chapter_id: ChapterID | str, deck_id: DeckID | str, card_id: str
@@ -1157,15 +2149,85 @@ class Markji:
         :rtype: Chapter
         :raises aiohttp.ClientResponseError: 删除卡片失败
         """
-        async with self._session() as session:
-            async with session.delete(
-                f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}/{_CARD_ROUTE}/{card_id}"
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "DELETE",
+            f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}/{_CARD_ROUTE}/{card_id}",
+            invalidate=[
+                ("decks",),
+                ("deck", deck_id),
+                ("chapters", deck_id),
+                ("chapter", deck_id, chapter_id),
+                ("card", deck_id, card_id),
+            ],
+        )
+        chapter = Chapter.from_dict(data["data"]["chapter"])
+        self._state.fold_chapter(deck_id, chapter)
+
+        return chapter
+
+    async def delete_cards(
+        self,
+        deck_id: DeckID | str,
+        cards: Iterable[tuple[ChapterID | str, CardID | str]],
+        concurrency: int = 10,
+    ) -> tuple[dict[ChapterID | str, Chapter], list[BaseException | None]]:
+        """
+        批量删除卡片
+
+        按章节分组，每个章节的卡片按顺序逐张删除，不同章节同时删除，
+        同时删除的章节数不超过 concurrency，一张卡片失败不影响其他卡片
+
+        :param DeckID | str deck_id: 卡组ID
+        :param Iterable[tuple[ChapterID | str, CardID | str]] cards: 章节ID, 卡片ID 列表
+        :param int concurrency: 最大并发数
+        :return: 章节ID到最后一次删除后的章节的映射，只包含有卡片删除成功的章节；
+            与卡片顺序相同的列表，删除成功的位置为 None，失败的位置为对应的异常
+        :rtype: tuple[dict[ChapterID | str, Chapter], list[BaseException | None]]
+        :raises ValueError: 并发数错误
+
+        .. code-block:: python
+
+            chapters, errors = await client.delete_cards(
+                deck_id, [(chapter_id, card_id) for card_id in card_ids]
+            )
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+
+        # the position and ID of the cards of each chapter
+        groups: dict[ChapterID | str, list[tuple[int, CardID | str]]] = {}
+        errors: list[BaseException | None] = []
+        for index, (chapter_id, card_id) in enumerate(cards):
+            groups.setdefault(chapter_id, []).append((index, card_id))
+            errors.append(None)
 
-        return Chapter.from_dict(data["data"]["chapter"])
+        semaphore = asyncio.Semaphore(concurrency)
+        chapters: dict[ChapterID | str, Chapter] = {}
+
+        async def delete(
+            chapter_id: ChapterID | str, items: list[tuple[int, CardID | str]]
+        ):
+            async with semaphore:
+                # one at a time, each deletion changes the chapter
+                for position, (index, card_id) in enumerate(items):
+                    try:
+                        chapters[chapter_id] = await self.delete_card(
+                            chapter_id, deck_id, card_id
+                        )
+                    except Exception as e:
+                        errors[index] = e
+                    except BaseException as e:
+                        # cancelled, the rest of the chapter is not deleted
+                        for index, _ in items[position:]:
+                            errors[index] = e
+                        raise
+
+        await asyncio.gather(
+            *(delete(chapter_id, items) for chapter_id, items in groups.items()),
+            return_exceptions=True,
+        )
+
+        return chapters, errors
 
     async def edit_card(
         self,
@@ -1173,16 +2235,21 @@ class Markji:
         card_id: str,
         content: str,
         grammar_version: int = 3,
+        current: Card | None = None,
     ) -> Card:
         """
         编辑卡片
 
         卡片内容长度必须在 1 到 2500 个字符之间
 
+        传入的当前卡片与新内容和语法版本相同时不发送请求，直接返回该卡片，跳过的次数见 skipped_edits；
+        没有传入时只使用本客户端创建或编辑卡片后缓存的卡片，读取时缓存的卡片可能已被其他客户端修改，不用于跳过
+
         :param DeckID | str deck_id: 卡组ID
         :param str card_id: 卡片ID
         :param str content: 卡片内容
         :param int grammar_version: 语法版本
+        :param Card | None current: 已知的当前卡片，None 为使用本客户端写入后缓存的卡片
         :return: 编辑后的卡片
         :rtype: Card
         :raises ValueError: 卡片内容长度错误
@@ -1191,45 +2258,133 @@ class Markji:
         if len(content) < 1 or len(content) > 2500:
             raise ValueError("卡片内容必须在 1 到 2500 个字符之间")
 
-        async with self._session() as session:
-            async with session.post(
-                f"{_DECK_ROUTE}/{deck_id}/{_CARD_ROUTE}/{card_id}",
-                json=_EditCardForm(_ContentInfo(content, grammar_version)).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        if current is None or current.id != card_id:
+            cached = self._cards.get(card_id)
+            current = cached[0] if cached is not None and cached[1] else None
+        if current is not None and _content_hash(
+            current.content, current.grammar_version
+        ) == _content_hash(content, grammar_version):
+            self._skipped_edits += 1
+            return current
+
+        data: dict = await self._request(
+            "POST",
+            f"{_DECK_ROUTE}/{deck_id}/{_CARD_ROUTE}/{card_id}",
+            json=_EditCardForm(_ContentInfo(content, grammar_version)).to_dict(),
+            idempotent=True,
+            invalidate=[("decks",), ("deck", deck_id), ("card", deck_id, card_id)],
+        )
+
+        card = Card.from_dict(data["data"]["card"])
+        self._remember_cards(deck_id, [card], written=True)
+
+        return card
+
+    async def edit_cards(
+        self,
+        deck_id: DeckID | str,
+        contents: Mapping[_K, str],
+        grammar_version: int = 3,
+        concurrency: int = 10,
+        current: Iterable[Card] = (),
+    ) -> list[Card | BaseException]:
+        """
+        批量编辑卡片
+
+        同时编辑的卡片数不超过 concurrency，一张卡片失败不影响其他卡片
+
+        卡片内容长度必须在 1 到 2500 个字符之间
 
-        return Card.from_dict(data["data"]["card"])
+        :param DeckID | str deck_id: 卡组ID
+        :param Mapping[CardID | str, str] contents: 卡片ID到卡片内容的映射
+        :param int grammar_version: 语法版本
+        :param int concurrency: 最大并发数
+        :param Iterable[Card] current: 已知的当前卡片，内容未变化的卡片不发送请求
+        :return: 与映射顺序相同的列表，编辑失败的位置为对应的异常
+        :rtype: list[Card | BaseException]
+        :raises ValueError: 并发数错误
+
+        .. code-block:: python
+
+            results = await client.edit_cards(deck_id, {card_id: content})
+            for result in results:
+                if isinstance(result, BaseException):
+                    ...
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+
+        semaphore = asyncio.Semaphore(concurrency)
+        cards: dict[str, Card] = {card.id: card for card in current}
+
+        async def edit(card_id: CardID | str, content: str) -> Card:
+            async with semaphore:
+                return await self.edit_card(
+                    deck_id, card_id, content, grammar_version, cards.get(card_id)
+                )
+
+        return await asyncio.gather(
+            *(edit(card_id, content) for card_id, content in contents.items()),
+            return_exceptions=True,
+        )
 
     async def sort_cards(
         self,
         deck_id: DeckID | str,
         chapter_id: ChapterID | str,
         card_ids: Iterable[CardID | str],
+        revision: int | None = None,
     ) -> Chapter:
         """
         排序卡片
 
+        传入或在本地记录了章节的修订版本时不再先获取章节，
+        其他客户端同时修改章节导致被拒绝时重新获取，按原顺序排列后重试，最多发送 3 次
+
         :param DeckID | str deck_id: 卡组ID
         :param ChapterID | str chapter_id: 章节ID
         :param Iterable[str] card_ids: 排序后的卡片ID列表
+        :param int | None revision: 已知的章节修订版本，None 为使用记录的版本或先获取
         :return: 排序后的章节
         :rtype: Chapter
         :raises aiohttp.ClientResponseError: 排序卡片失败
         """
-        chapter = await self.get_chapter(deck_id, chapter_id)
+        card_ids = [str(card_id) for card_id in card_ids]
+        if revision is None:
+            revision = self._state.chapter_revision(deck_id, chapter_id)
+
+        async def refresh() -> tuple[int, list[str]]:
+            self._cache.invalidate(("chapter", deck_id, chapter_id))
+            chapter = await self.get_chapter(deck_id, chapter_id)
+
+            return chapter.revision, list(chapter.card_ids)
 
-        async with self._session() as session:
-            async with session.post(
-                f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}/{_CARD_ROUTE}/{_SORT_ROUTE}",
-                json=_SortCardsForm(card_ids, chapter.revision).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        return await self._rebase(
+            card_ids,
+            revision,
+            refresh,
+            lambda card_ids, revision: self._sort_cards(
+                deck_id, chapter_id, card_ids, revision
+            ),
+        )
+
+    async def _sort_cards(
+        self,
+        deck_id: DeckID | str,
+        chapter_id: ChapterID | str,
+        card_ids: Iterable[CardID | str],
+        revision: int,
+    ) -> Chapter:
+        data: dict = await self._request(
+            "POST",
+            f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id}/{_CARD_ROUTE}/{_SORT_ROUTE}",
+            json=_SortCardsForm(card_ids, revision).to_dict(),
+            invalidate=[("chapters", deck_id), ("chapter", deck_id, chapter_id)],
+        )
+        chapter = Chapter.from_dict(data["data"]["chapter"])
+        self._state.fold_chapter(deck_id, chapter)
 
-        return Chapter.from_dict(data["data"]["chapter"])
+        return chapter
 
     async def move_cards(
         self,
@@ -1251,18 +2406,624 @@ class Markji:
         :raises aiohttp.ClientResponseError: 移动卡片失败
         """
         if order is None:
-            order = len(await self.list_cards(deck_id, chapter_id_to))
+            order = await self._card_count(deck_id, chapter_id_to)
+
+        data: dict = await self._request(
+            "POST",
+            f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id_from}/{_CARD_ROUTE}/{_MOVE_ROUTE}",
+            json=_MoveCardsForm(chapter_id_to, order, card_ids).to_dict(),
+            invalidate=[
+                ("chapters", deck_id),
+                ("chapter", deck_id, chapter_id_from),
+                ("chapter", deck_id, chapter_id_to),
+            ],
+        )
+        diff = ChapterDiff.from_dict(data["data"])
+        self._state.fold_chapter(deck_id, diff.old_chapter)
+        self._state.fold_chapter(deck_id, diff.new_chapter)
+
+        return diff
+
+    async def move_cards_bulk(
+        self,
+        deck_id: DeckID | str,
+        moves: Iterable[tuple[CardID | str, ChapterID | str, ChapterID | str]],
+        concurrency: int = 10,
+    ) -> tuple[dict[ChapterID | str, Chapter], list[BaseException | None]]:
+        """
+        批量移动卡片
+
+        按原章节和目标章节分组，每组只发送一次移动请求，卡片按顺序移动到目标章节末尾
+
+        涉及同一章节的组按顺序依次移动，互不相关的组同时移动，同时进行的组数不超过 concurrency，
+        目标章节的卡片数只在第一次移动到该章节时获取章节，之后从移动结果中得到，
+        一组失败不影响其他组
+
+        :param DeckID | str deck_id: 卡组ID
+        :param Iterable[tuple[CardID | str, ChapterID | str, ChapterID | str]] moves: 卡片ID, 原章节ID, 目标章节ID 列表
+        :param int concurrency: 最大并发数
+        :return: 章节ID到移动后的章节的映射，只包含有卡片移动成功的章节；
+            与移动顺序相同的列表，移动成功的位置为 None，失败的位置为所在组的异常
+        :rtype: tuple[dict[ChapterID | str, Chapter], list[BaseException | None]]
+        :raises ValueError: 并发数错误
+
+        .. code-block:: python
+
+            chapters, errors = await client.move_cards_bulk(
+                deck_id,
+                [(card_id, chapter_id_from, chapter_id_to) for card_id in card_ids],
+            )
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+
+        groups: dict[tuple[ChapterID | str, ChapterID | str], list[CardID | str]] = {}
+        # the group of each move, None when the card is already there
+        keys: list[tuple[ChapterID | str, ChapterID | str] | None] = []
+        for card_id, chapter_id_from, chapter_id_to in moves:
+            if chapter_id_from == chapter_id_to:
+                keys.append(None)
+                continue
+
+            key = (chapter_id_from, chapter_id_to)
+            groups.setdefault(key, []).append(card_id)
+            keys.append(key)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        counts: dict[ChapterID | str, int] = {}
+        chapters: dict[ChapterID | str, Chapter] = {}
+
+        async def move(
+            chapter_id_from: ChapterID | str,
+            chapter_id_to: ChapterID | str,
+            card_ids: list[CardID | str],
+            after: list[asyncio.Future],
+        ):
+            # earlier groups sharing a chapter go first, failed or not
+            if after:
+                await asyncio.wait(after)
+
+            async with semaphore:
+                try:
+                    order = counts.get(chapter_id_to)
+                    if order is None:
+                        order = await self._card_count(deck_id, chapter_id_to)
+                    diff = await self.move_cards(
+                        deck_id, chapter_id_from, chapter_id_to, card_ids, order
+                    )
+                except BaseException:
+                    # the chapters are unknown after a failed move
+                    counts.pop(chapter_id_from, None)
+                    counts.pop(chapter_id_to, None)
+                    raise
+
+            for chapter in (diff.old_chapter, diff.new_chapter):
+                counts[chapter.id] = len(chapter.card_ids)
+                chapters[chapter.id] = chapter
+
+        # each group waits for the last earlier group of both its chapters,
+        # which keeps the writes of every chapter in order
+        last: dict[ChapterID | str, asyncio.Future] = {}
+        tasks = []
+        for (chapter_id_from, chapter_id_to), card_ids in groups.items():
+            after = [
+                last[chapter_id]
+                for chapter_id in (chapter_id_from, chapter_id_to)
+                if chapter_id in last
+            ]
+            task = asyncio.ensure_future(
+                move(chapter_id_from, chapter_id_to, card_ids, after)
+            )
+            last[chapter_id_from] = last[chapter_id_to] = task
+            tasks.append(task)
+
+        results = dict(
+            zip(groups, await asyncio.gather(*tasks, return_exceptions=True))
+        )
+
+        return chapters, [results[key] if key is not None else None for key in keys]
+
+    async def plan_deck(
+        self,
+        deck_id: DeckID | str,
+        layout: Iterable[ChapterLayout],
+        chunk_size: int = 500,
+        concurrency: int = 4,
+    ) -> DeckPlan:
+        """
+        生成卡组计划
+
+        比较卡组的当前状态和期望的布局，生成使卡组变为期望布局所需的操作
+
+        同名章节保留，其他章节按顺序重命名复用，多余的章节删除；
+        内容相同的卡片保留或移动，同一章节中其他的卡片编辑复用，多余的卡片删除
+
+        :param DeckID | str deck_id: 卡组ID
+        :param Iterable[ChapterLayout] layout: 按顺序排列的章节布局
+        :param int chunk_size: 每次查询的卡片数
+        :param int concurrency: 最大并发数
+        :return: 卡组计划
+        :rtype: DeckPlan
+        :raises ValueError: 章节名长度错误
+        :raises ValueError: 卡片内容长度错误
+        :raises ValueError: 分批参数错误
+        :raises aiohttp.ClientResponseError: 获取卡组失败
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须大于等于 1")
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+
+        layout = list(layout)
+        _validate(layout)
+
+        chapter_set, chapters = await self._list_chapters(deck_id)
+        chapter_map = {chapter.id: chapter for chapter in chapters}
+        chapters = [
+            chapter_map[chapter_id]
+            for chapter_id in chapter_set.chapter_ids
+            if chapter_id in chapter_map
+        ]
+        cards = {
+            card.id: card
+            async for _, card in self._iter_cards(
+                deck_id,
+                (
+                    (None, card_id)
+                    for chapter in chapters
+                    for card_id in chapter.card_ids
+                ),
+                chunk_size,
+                concurrency,
+            )
+        }
+
+        return _diff(DeckID(deck_id), chapters, cards, layout)
+
+    async def apply_deck_plan(
+        self, plan: DeckPlan, grammar_version: int = 3, concurrency: int = 10
+    ) -> list[Chapter]:
+        """
+        执行卡组计划
+
+        先创建和重命名章节，再同时编辑、移动、删除和创建卡片，
+        最后排序卡片、删除多余的章节并排序章节，同时进行的请求不超过 concurrency 个
+
+        执行失败时已完成的操作不会撤销，重新生成并执行计划即可继续
+
+        :param DeckPlan plan: 卡组计划
+        :param int grammar_version: 语法版本
+        :param int concurrency: 最大并发数
+        :return: 按顺序排列的章节
+        :rtype: list[Chapter]
+        :raises ValueError: 并发数错误
+        :raises ExceptionGroup: 执行计划失败
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+
+        deck_id = plan.deck_id
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limit(coro: Awaitable[_T]) -> _T:
+            async with semaphore:
+                return await coro
+
+        chapter_ids = [chapter_plan.chapter_id for chapter_plan in plan.chapters]
+
+        async def new_chapter(index: int, name: str):
+            chapter = await limit(self.new_chapter(deck_id, name))
+            chapter_ids[index] = chapter.id
+
+        # cards need the IDs of new chapters
+        async with asyncio.TaskGroup() as group:
+            for index, chapter_plan in enumerate(plan.chapters):
+                if chapter_plan.chapter_id is None:
+                    group.create_task(new_chapter(index, chapter_plan.name))
+                elif chapter_plan.rename:
+                    group.create_task(
+                        limit(
+                            self.rename_chapter(
+                                deck_id, chapter_plan.chapter_id, chapter_plan.name
+                            )
+                        )
+                    )
+
+        new_card_ids = [
+            [""] * len(chapter_plan.new_cards) for chapter_plan in plan.chapters
+        ]
+
+        async def new_card(index: int, position: int, content: str):
+            # the order is fixed by the sort afterwards
+            card = await limit(
+                self._new_card(
+                    deck_id,
+                    cast(ChapterID, chapter_ids[index]),
+                    content,
+                    grammar_version,
+                    0,
+                )
+            )
+            new_card_ids[index][position] = card.id
+
+        # card writes do not depend on each other
+        async with asyncio.TaskGroup() as group:
+            for card_id, content in plan.edit_cards.items():
+                group.create_task(
+                    limit(self.edit_card(deck_id, card_id, content, grammar_version))
+                )
+            for chapter_id, target, card_ids in plan.move_cards:
+                group.create_task(
+                    limit(
+                        self.move_cards(
+                            deck_id,
+                            chapter_id,
+                            cast(ChapterID, chapter_ids[target]),
+                            card_ids,
+                            0,
+                        )
+                    )
+                )
+            for chapter_id, card_id in plan.delete_cards:
+                group.create_task(limit(self.delete_card(chapter_id, deck_id, card_id)))
+            for index, chapter_plan in enumerate(plan.chapters):
+                for position, content in enumerate(chapter_plan.new_cards):
+                    group.create_task(new_card(index, position, content))
+
+        chapters: list[Chapter | None] = [None] * len(plan.chapters)
+
+        async def sort_cards(index: int, card_ids: list[CardID]):
+            chapter_id = cast(ChapterID, chapter_ids[index])
+            chapter = await limit(self.get_chapter(deck_id, chapter_id))
+            if chapter.card_ids != card_ids:
+                chapter = await limit(
+                    self.sort_cards(deck_id, chapter_id, card_ids, chapter.revision)
+                )
+            chapters[index] = chapter
+
+        # sorting needs every card in place, deleting needs moved cards out
+        async with asyncio.TaskGroup() as group:
+            for index, chapter_plan in enumerate(plan.chapters):
+                if not chapter_plan.sort:
+                    continue
+
+                card_ids = [
+                    (
+                        new_card_ids[index][card_id]
+                        if isinstance(card_id, int)
+                        else card_id
+                    )
+                    for card_id in chapter_plan.cards
+                ]
+                group.create_task(sort_cards(index, cast(list[CardID], card_ids)))
+            for chapter_id in plan.delete_chapters:
+                group.create_task(limit(self.delete_chapter(deck_id, chapter_id)))
+
+        # the chapters left as they are and the chapter order take one read
+        if plan.sort_chapters or None in chapters:
+            chapter_set, listed = await self._list_chapters(deck_id)
+            chapter_map = {chapter.id: chapter for chapter in listed}
+            for index, chapter_id in enumerate(chapter_ids):
+                if chapters[index] is None:
+                    chapters[index] = chapter_map[cast(ChapterID, chapter_id)]
+
+            if plan.sort_chapters and chapter_set.chapter_ids != chapter_ids:
+                await self.sort_chapters(
+                    deck_id, cast(list[ChapterID], chapter_ids), chapter_set.revision
+                )
+
+        return cast(list[Chapter], chapters)
+
+    async def reconcile_deck(
+        self,
+        deck_id: DeckID | str,
+        layout: Iterable[ChapterLayout],
+        grammar_version: int = 3,
+        concurrency: int = 10,
+        chunk_size: int = 500,
+    ) -> DeckPlan:
+        """
+        使卡组变为期望的布局
+
+        生成并执行卡组计划，见 plan_deck 和 apply_deck_plan，两者使用相同的并发数
+
+        :param DeckID | str deck_id: 卡组ID
+        :param Iterable[ChapterLayout] layout: 按顺序排列的章节布局
+        :param int grammar_version: 语法版本
+        :param int concurrency: 最大并发数
+        :param int chunk_size: 生成计划时每次查询的卡片数
+        :return: 执行的卡组计划
+        :rtype: DeckPlan
+        :raises ValueError: 章节名长度错误
+        :raises ValueError: 卡片内容长度错误
+        :raises ValueError: 并发数错误
+        :raises ValueError: 分批参数错误
+        :raises aiohttp.ClientResponseError: 获取卡组失败
+        :raises ExceptionGroup: 执行计划失败
+
+        .. code-block:: python
+
+            from markji.reconcile import ChapterLayout
+
+            plan = await client.reconcile_deck(
+                deck_id,
+                [
+                    ChapterLayout("chapter 1", ["card 1", "card 2"]),
+                    ChapterLayout("chapter 2", ["card 3"]),
+                ],
+            )
+            print(len(plan))
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须大于等于 1")
+
+        plan = await self.plan_deck(deck_id, layout, chunk_size, concurrency)
+        await self.apply_deck_plan(plan, grammar_version, concurrency)
+
+        return plan
+
+    async def export_account(
+        self,
+        path: str | os.PathLike,
+        concurrency: int = 4,
+        chunk_size: int = 500,
+        state_file: str | os.PathLike | None = None,
+    ) -> int:
+        """
+        导出账户
 
-        async with self._session() as session:
-            async with session.post(
-                f"{_DECK_ROUTE}/{deck_id}/{_CHAPTER_ROUTE}/{chapter_id_from}/{_CARD_ROUTE}/{_MOVE_ROUTE}",
-                json=_MoveCardsForm(chapter_id_to, order, card_ids).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        将根文件夹、文件夹、卡组、章节和卡片逐行写入压缩的 JSONL 文件，
+        每行为 {"type": 类型, "id": ID, "parent_id": 上级ID, "data": 对象}，
+        类型为 folder、deck、chapterset、chapter 或 card，上级分别为文件夹、文件夹、卡组、卡组和章节
 
-        return ChapterDiff.from_dict(data["data"])
+        同时导出的卡组数不超过 concurrency，卡片按 chunk_size 分批获取，
+        获取到的对象立即写入文件，内存占用与账户大小无关
+
+        文件后缀为 .gz 时使用 gzip 压缩，为 .xz 或 .lzma 时使用 lzma 压缩，
+        导出完成后才替换目标文件，导出失败时目标文件不变
+
+        设置 state_file 时导出完成后保存各对象的修订版本，之后可以用 sync_account 只导出变化的对象
+
+        :param str | os.PathLike path: 文件路径
+        :param int concurrency: 最大并发数
+        :param int chunk_size: 每次查询的卡片数
+        :param str | os.PathLike | None state_file: 同步状态文件路径，None 为不保存
+        :return: 写入的对象数
+        :rtype: int
+        :raises ValueError: 文件后缀错误
+        :raises ValueError: 并发数错误
+        :raises ValueError: 分批参数错误
+        :raises ExceptionGroup: 导出失败
+
+        .. code-block:: python
+
+            count = await client.export_account("backup.jsonl.gz")
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须大于等于 1")
+
+        async with _JsonlWriter(path, self._dumps) as writer:
+            state = await self._export_account(
+                writer.write, None, concurrency, chunk_size
+            )
+        if state_file is not None:
+            await asyncio.to_thread(_write_state, state_file, self._dumps(state))
+
+        return writer.count
+
+    async def sync_account(
+        self,
+        state_file: str | os.PathLike,
+        path: str | os.PathLike,
+        concurrency: int = 4,
+        chunk_size: int = 500,
+    ) -> int:
+        """
+        同步账户
+
+        与上次导出或同步时保存在 state_file 中的修订版本比较，只将变化的对象写入 path，
+        格式与 export_account 相同，删除的对象写为 data 为 null 的一行
+
+        每个文件夹获取一次卡组列表，更新时间和修订版本都未变化的卡组不再获取，
+        变化的卡组获取一次章节列表，只获取修订版本变化的章节中的卡片，
+        章节的 card_ids 即为章节当前的全部卡片，不在其中的卡片已被删除或移动到其他章节
+
+        state_file 不存在时写入所有对象，写入完成后才更新 state_file，同步失败时可以重新同步
+
+        :param str | os.PathLike state_file: 同步状态文件路径
+        :param str | os.PathLike path: 文件路径
+        :param int concurrency: 最大并发数
+        :param int chunk_size: 每次查询的卡片数
+        :return: 写入的对象数
+        :rtype: int
+        :raises ValueError: 文件后缀错误
+        :raises ValueError: 并发数错误
+        :raises ValueError: 分批参数错误
+        :raises ExceptionGroup: 同步失败
+
+        .. code-block:: python
+
+            await client.export_account("backup.jsonl.gz", state_file="state.json")
+            ...
+            count = await client.sync_account("state.json", "changes.jsonl.gz")
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须大于等于 1")
+
+        data = await asyncio.to_thread(_read_state, state_file)
+        state = self._loads(data) if data is not None else None
+        async with _JsonlWriter(path, self._dumps) as writer:
+            state = await self._export_account(
+                writer.write, state, concurrency, chunk_size
+            )
+        await asyncio.to_thread(_write_state, state_file, self._dumps(state))
+
+        return writer.count
+
+    async def sync_records(
+        self,
+        write: Callable[[dict], Awaitable[Any]],
+        state: dict | None = None,
+        concurrency: int = 4,
+        chunk_size: int = 500,
+    ) -> dict:
+        """
+        同步账户记录
+
+        获取方式与 sync_account 相同，但不写入文件，记录逐条传给 write，格式与 export_account 的每一行相同，
+        传出记录的任务等待 write 返回后才继续获取，可以在 write 中写入数据库等位置
+
+        state 为上次调用返回的同步状态，None 为传出所有对象，
+        同步失败时已传出的记录不受影响，使用上次的 state 重新同步即可
+
+        :param Callable[[dict], Awaitable[Any]] write: 接收一条记录的异步函数
+        :param dict | None state: 上次调用返回的同步状态，None 为传出所有对象
+        :param int concurrency: 最大并发数
+        :param int chunk_size: 每次查询的卡片数
+        :return: 本次的同步状态，可以 JSON 序列化保存
+        :rtype: dict
+        :raises ValueError: 并发数错误
+        :raises ValueError: 分批参数错误
+        :raises ExceptionGroup: 同步失败
+
+        .. code-block:: python
+
+            async def write(record: dict):
+                print(record["type"], record["id"])
+
+            state = await client.sync_records(write)
+            ...
+            state = await client.sync_records(write, state)
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于等于 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须大于等于 1")
+
+        return await self._export_account(write, state, concurrency, chunk_size)
+
+    async def _export_account(
+        self,
+        write: Callable[[dict], Awaitable[Any]],
+        state: dict | None,
+        concurrency: int,
+        chunk_size: int,
+    ) -> dict:
+        # state: watermarks of the previous export, None to write everything,
+        # returns the watermarks of this one
+        old_folders: dict[str, str] = state["folders"] if state is not None else {}
+        old_decks: dict[str, dict] = state["decks"] if state is not None else {}
+        folders: dict[str, str] = {}
+        decks: dict[str, dict] = {}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def export_deck(folder_id: FolderID, deck: DeckInfo):
+            old = old_decks.get(deck.id)
+            updated_time = deck.updated_time.isoformat()
+            if (
+                old is not None
+                and old["folder_id"] == folder_id
+                and old["revision"] == deck.revision
+                and old["updated_time"] == updated_time
+            ):
+                decks[deck.id] = old
+                return
+
+            async with semaphore:
+                await write(_record("deck", folder_id, deck))
+                chapter_set, chapters = await self._list_chapters(deck.id)
+                chapter_map = {chapter.id: chapter for chapter in chapters}
+                chapters = [
+                    chapter_map[chapter_id]
+                    for chapter_id in chapter_set.chapter_ids
+                    if chapter_id in chapter_map
+                ]
+
+                old_chapters: dict[str, int] = (
+                    old["chapters"] if old is not None else {}
+                )
+                if old is None or old["chapter_set_revision"] != chapter_set.revision:
+                    await write(_record("chapterset", deck.id, chapter_set))
+                    for chapter_id in old_chapters.keys() - chapter_map.keys():
+                        await write(_deleted("chapter", deck.id, chapter_id))
+                changed = [
+                    chapter
+                    for chapter in chapters
+                    if old_chapters.get(chapter.id) != chapter.revision
+                ]
+                for chapter in changed:
+                    await write(_record("chapter", deck.id, chapter))
+
+                # two chunks in flight per deck keep memory bounded
+                async with aclosing(
+                    self._iter_cards(
+                        deck.id,
+                        (
+                            (chapter.id, card_id)
+                            for chapter in changed
+                            for card_id in chapter.card_ids
+                        ),
+                        chunk_size,
+                        2,
+                    )
+                ) as cards:
+                    async for chapter_id, card in cards:
+                        await write(_record("card", chapter_id, card))
+
+            decks[deck.id] = {
+                "folder_id": folder_id,
+                "revision": deck.revision,
+                "updated_time": updated_time,
+                "chapter_set_revision": chapter_set.revision,
+                "chapters": {chapter.id: chapter.revision for chapter in chapters},
+            }
+
+        async def export_folder(
+            folder: Folder | RootFolder,
+            parent_id: FolderID | None,
+            group: asyncio.TaskGroup,
+        ):
+            updated_time = folder.updated_time.isoformat()
+            folders[folder.id] = updated_time
+            if old_folders.get(folder.id) != updated_time:
+                await write(_record("folder", parent_id, folder))
+            # the root folder holds folders, the others hold decks
+            if parent_id is None:
+                return
+
+            async with semaphore:
+                deck_infos = await self.list_decks(folder.id)
+            for deck in deck_infos:
+                group.create_task(export_deck(folder.id, deck))
+
+        # one request, both read the same folder list
+        root_folder, folder_list = await asyncio.gather(
+            self.get_root_folder(), self.list_folders()
+        )
+        folder_map = {folder.id: folder for folder in folder_list}
+        async with asyncio.TaskGroup() as group:
+            group.create_task(export_folder(root_folder, None, group))
+            # in the order of the root folder
+            for item in root_folder.items:
+                if item.object_id in folder_map:
+                    group.create_task(
+                        export_folder(
+                            folder_map[FolderID(item.object_id)], root_folder.id, group
+                        )
+                    )
+
+        for deck_id in old_decks.keys() - decks.keys():
+            await write(_deleted("deck", old_decks[deck_id]["folder_id"], deck_id))
+        for folder_id in old_folders.keys() - folders.keys():
+            await write(_deleted("folder", root_folder.id, folder_id))
+
+        return {"folders": folders, "decks": decks}
 
     async def search_cards(
         self,
@@ -1302,35 +3063,93 @@ class Markji:
         if limit < 10 or limit > 100:
             raise ValueError("limit 必须在 10 到 100 之间")
 
-        async with self._session() as session:
-            params = {
-                "keyword": keyword,
-                "offset": offset,
-                "limit": limit,
-                "source": "SEARCH",
-            }
+        params = {
+            "keyword": keyword,
+            "offset": offset,
+            "limit": limit,
+            "source": "SEARCH",
+        }
+
+        if self_only:
+            params["scope"] = _SearchScope.MINE
 
-            if self_only:
-                params["scope"] = _SearchScope.MINE
-
-            if deck_id is not None:
-                params["deck_id"] = deck_id
-                params["scope"] = _SearchScope.DECK
-
-            async with session.get(
-                f"{_CARD_ROUTE}/{_SEARCH_ROUTE}",
-                params=params,
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                cards = []
-                for card in data["data"]["cards"]:
-                    card = CardResult.from_dict(card)
-                    cards.append(card)
+        if deck_id is not None:
+            params["deck_id"] = deck_id
+            params["scope"] = _SearchScope.DECK
+
+        data: dict = await self._request(
+            "GET", f"{_CARD_ROUTE}/{_SEARCH_ROUTE}", params=params
+        )
+        cards = []
+        for card in data["data"]["cards"]:
+            card = CardResult.from_dict(card)
+            cards.append(card)
 
         return cards, data["data"]["total"]
 
+    async def iter_search_cards(
+        self,
+        keyword: str,
+        offset: int = 0,
+        limit: int = 100,
+        self_only: bool = False,
+        deck_id: DeckID | str | None = None,
+        count: int | None = None,
+    ) -> AsyncGenerator[tuple[CardResult, int, bool], None]:
+        """
+        逐个获取搜索到的卡片
+
+        从 offset 开始按 limit 分页搜索，处理当前页时提前获取下一页
+
+        服务器只允许 offset 在 0 到 1000 之间，从 offset 1000 开始的一页是最后一页，
+        总数大于能获取到的卡片数时结果被截断，每个结果都附带是否被截断
+
+        获取到 count 张卡片后停止，不再获取后面的页
+
+        其他参数见 search_cards
+
+        :param str keyword: 关键词
+        :param int offset: 偏移
+        :param int limit: 每页的卡片数
+        :param bool self_only: 仅自己的
+        :param DeckID | str | None deck_id: 卡组ID
+        :param int | None count: 最多获取的卡片数，None 为不限制
+        :return: 卡片, 总数, 是否被截断
+        :rtype: AsyncGenerator[tuple[CardResult, int, bool], None]
+        :raises ValueError: 关键词长度错误
+        :raises ValueError: offset 错误
+        :raises ValueError: limit 错误
+        :raises ValueError: count 错误
+        :raises aiohttp.ClientResponseError: 搜索卡片失败
+
+        .. code-block:: python
+
+            async for card, total, truncated in client.iter_search_cards(keyword):
+                print(card.content, total, truncated)
+        """
+        if len(keyword) < 1 or len(keyword) > 8000:
+            raise ValueError("关键词长度必须在 1 到 8000 个字符之间")
+        if offset < 0 or offset > 1000:
+            raise ValueError("offset 必须在 0 到 1000 之间")
+        if limit < 10 or limit > 100:
+            raise ValueError("limit 必须在 10 到 100 之间")
+        if count is not None and count < 1:
+            raise ValueError("count 必须大于等于 1")
+
+        async with aclosing(
+            _iter_pages(
+                lambda offset, limit: self.search_cards(
+                    keyword, offset, limit, self_only, deck_id
+                ),
+                offset,
+                limit,
+                1000,
+                count=count,
+            )
+        ) as cards:
+            async for card, total, truncated in cards:
+                yield card, total, truncated
+
     async def upload_file(self, path: Path | str | IO[bytes]) -> File:
         """
         上传文件（图片和音频）
@@ -1340,20 +3159,18 @@ class Markji:
         :rtype: File
         :raises aiohttp.ClientResponseError: 上传文件失败
         """
-        async with self._session() as session:
-            if isinstance(path, str):
-                io = open(path, "rb")
-            else:
-                io = path
+        if isinstance(path, str):
+            io = open(path, "rb")
+        else:
+            io = path
 
-            async with session.post(
-                _FILE_ROUTE, data=_UploadFileForm(io).to_dict()
-            ) as response:
-                if isinstance(io, BufferedReader):
-                    io.close()
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        try:
+            data: dict = await self._request(
+                "POST", _FILE_ROUTE, data=_UploadFileForm(io).to_dict()
+            )
+        finally:
+            if isinstance(io, BufferedReader):
+                io.close()
 
         return File.from_dict(data["data"]["file"])
 
@@ -1370,22 +3187,14 @@ class Markji:
         """
         lang = LanguageCode(lang) if isinstance(lang, str) else lang
 
-        async with self._session() as session:
-            async with session.post(
-                _TTS_ROUTE,
-                json=_TTSGenForm(TTSItem(text, lang)).to_dict(),
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
-                url = data["data"]["url"]
-
-            async with session.post(
-                _URL_ROUTE, json=_TTSGetFileForm(url).to_dict()
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+        data: dict = await self._request(
+            "POST", _TTS_ROUTE, json=_TTSGenForm(TTSItem(text, lang)).to_dict()
+        )
+        url = data["data"]["url"]
+
+        data: dict = await self._request(
+            "POST", _URL_ROUTE, json=_TTSGetFileForm(url).to_dict()
+        )
 
         return File.from_dict(data["data"]["file"])
 
@@ -1401,19 +3210,14 @@ class Markji:
         if isinstance(mask, str):
             io = open(mask, "r")
         else:
-            io = json.dumps(
+            io = self._dumps(
                 [i.to_dict() if isinstance(i, MaskItem) else i for i in mask]
-            ).encode()
-
-        async with self._session() as session:
-            form = FormData()
-            form.add_field("file", io, filename="mask.msk1", content_type="markji/mask")
-            async with session.post(
-                _FILE_ROUTE,
-                data=form,
-            ) as response:
-                response = _ResponseWrapper(response)
-                await response.raise_for_status()
-                data: dict = await response.json()
+            )
+            if isinstance(io, str):
+                io = io.encode()
+
+        form = FormData()
+        form.add_field("file", io, filename="mask.msk1", content_type="markji/mask")
+        data: dict = await self._request("POST", _FILE_ROUTE, data=form)
 
         return File.from_dict(data["data"]["file"])
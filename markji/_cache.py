@@ -0,0 +1,68 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+_K = TypeVar("_K", bound=Hashable)
+_V = TypeVar("_V")
+
+
+class _TTLCache(Generic[_K, _V]):
+    # bounded LRU cache with per-entry expiry
+    # every entry carries a tag tuple, invalidating a tag also invalidates
+    # every tag it is a prefix of, e.g. ("chapter", deck_id) invalidates
+    # ("chapter", deck_id, chapter_id) for all chapters of the deck
+    def __init__(self, maxsize: int, ttl: float | None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[_K, tuple[float, tuple, _V]] = OrderedDict()
+        # bumped on every invalidation, a response fetched across an
+        # invalidation may be stale and must not be stored
+        self.epoch = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: _K) -> _V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires, _, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: _K, value: _V, tag: tuple = ()):
+        if self._maxsize <= 0:
+            return
+
+        expires = float("inf") if self._ttl is None else time.monotonic() + self._ttl
+        self._entries[key] = (expires, tag, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: _K):
+        self.epoch += 1
+        self._entries.pop(key, None)
+
+    def invalidate(self, *tags: tuple):
+        self.epoch += 1
+        if not self._entries:
+            return
+
+        for key, (_, tag, _) in list(self._entries.items()):
+            if any(tag[: len(prefix)] == prefix for prefix in tags):
+                del self._entries[key]
+
+    def clear(self):
+        self.epoch += 1
+        self._entries.clear()
@@ -22,3 +22,7 @@ _FORK_ROUTE: str = "fork"
 _SETTING_ROUTE: str = "settings"
 _ACCESS_ROUTE: str = "access"
 _LINK_ROUTE: str = "link"
+_AUTH_STATUS: int = 401  # rejected token
+# a write with a stale revision is rejected
+_CONFLICT_STATUSES: frozenset[int] = frozenset({400, 409})
+_REBASE_ATTEMPTS: int = 3  # writes of an order, including the first
@@ -0,0 +1,114 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+import asyncio
+import gzip
+import lzma
+import os
+from pathlib import Path
+from typing import Any, Self, cast
+
+from markji._json import _Dumps
+
+
+def _open_jsonl(path: Path, temp: Path) -> gzip.GzipFile | lzma.LZMAFile:
+    # compression follows the suffix of the target
+    if path.suffix == ".gz":
+        return gzip.GzipFile(temp, "wb")
+    if path.suffix in (".xz", ".lzma"):
+        return lzma.LZMAFile(temp, "wb")
+
+    raise ValueError("文件后缀必须为 .gz, .xz 或 .lzma")
+
+
+def _read_state(path: str | os.PathLike) -> str | None:
+    try:
+        with open(path, encoding="utf-8") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_state(path: str | os.PathLike, data: str | bytes):
+    # written next to the target and swapped in, never left half written
+    if isinstance(data, str):
+        data = data.encode()
+    temp = Path(path).with_name(Path(path).name + ".tmp")
+    temp.write_bytes(data)
+    os.replace(temp, path)
+
+
+class _JsonlWriter:
+    # records are encoded by the caller and written in batches by one task,
+    # the bounded queue stalls the producers while the file falls behind,
+    # the file replaces the target only when everything was written
+    def __init__(self, path: str | os.PathLike, dumps: _Dumps, maxsize: int = 1024):
+        self._path = Path(path)
+        self._temp = self._path.with_name(self._path.name + ".tmp")
+        self._dumps = dumps
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize)
+        self._file: gzip.GzipFile | lzma.LZMAFile | None = None
+        self._task: asyncio.Task | None = None
+        self._error: BaseException | None = None
+        self.count = 0
+
+    async def __aenter__(self) -> Self:
+        self._file = await asyncio.to_thread(_open_jsonl, self._path, self._temp)
+        self._task = asyncio.create_task(self._run())
+
+        return self
+
+    async def __aexit__(self, exc_type, *_):
+        file = self._file
+        task = self._task
+        if file is None or task is None:
+            return
+
+        if exc_type is None:
+            await self._queue.put(None)
+            await task
+        else:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        await asyncio.to_thread(file.close)
+        if exc_type is None and self._error is None:
+            os.replace(self._temp, self._path)
+        else:
+            self._temp.unlink(missing_ok=True)
+
+        if exc_type is None and self._error is not None:
+            raise self._error
+
+    async def write(self, record: Any):
+        if self._error is not None:
+            raise self._error
+
+        line = self._dumps(record)
+        if isinstance(line, str):
+            line = line.encode()
+        await self._queue.put(line + b"\n")
+        self.count += 1
+
+    async def _run(self):
+        file = cast(gzip.GzipFile | lzma.LZMAFile, self._file)
+        done = False
+        while not done:
+            batch: list[bytes] = []
+            # None is the sentinel closing the queue
+            line = await self._queue.get()
+            while line is not None:
+                batch.append(line)
+                if self._queue.empty() or len(batch) >= self._queue.maxsize:
+                    break
+                line = self._queue.get_nowait()
+            done = line is None
+
+            # keep draining after a failure so the producers do not block
+            if batch and self._error is None:
+                try:
+                    await asyncio.to_thread(file.write, b"".join(batch))
+                except Exception as e:
+                    self._error = e
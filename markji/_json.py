@@ -0,0 +1,20 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+import json
+from typing import Any, Callable
+
+_Loads = Callable[[str], Any]
+_Dumps = Callable[[Any], str | bytes]
+
+# orjson is used when installed, it is not a dependency
+try:
+    import orjson
+
+    _loads: _Loads = orjson.loads
+    _dumps: _Dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
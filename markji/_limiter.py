@@ -0,0 +1,114 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+import asyncio
+import time
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Mapping
+
+_THROTTLE_STATUSES: frozenset[int] = frozenset({429, 503})
+# backoff used when the server throttles without a Retry-After header
+_BASE_BACKOFF: float = 1
+_MAX_BACKOFF: float = 60
+
+
+def _parse_retry_after(headers: Mapping[str, str] | None) -> float | None:
+    if headers is None:
+        return None
+
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+
+    # delay-seconds
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+
+    # HTTP-date
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=UTC)
+
+    return max(0, (date - datetime.now(UTC)).total_seconds())
+
+
+class _RateLimiter:
+    # token bucket with additive increase / multiplicative decrease:
+    # each throttled response halves the rate and pauses every request
+    # until the server is expected to accept them again, each successful
+    # response moves the rate back up towards the configured maximum,
+    # responses to requests sent before the last throttle belong to the
+    # same burst and neither escalate nor relax it
+    def __init__(self, rate: float | None, burst: int):
+        self._max_rate = rate
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._throttled = 0
+        self._throttled_at = float("-inf")
+
+    @property
+    def rate(self) -> float | None:
+        return self._rate
+
+    def _reserve(self) -> float:
+        now = time.monotonic()
+        delay = self._paused_until - now
+
+        if self._rate is not None:
+            self._tokens = min(
+                self._burst, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            # tokens may go negative, the debt is paid by sleeping
+            self._tokens -= 1
+            if self._tokens < 0:
+                delay = max(delay, -self._tokens / self._rate)
+
+        return delay
+
+    async def acquire(self) -> float:
+        # returns when the request is sent, to be passed back with its response
+        delay = self._reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            # a throttle may have happened while sleeping
+            delay = self._paused_until - time.monotonic()
+
+        return time.monotonic()
+
+    def success(self, sent: float):
+        if sent < self._throttled_at:
+            return
+
+        self._throttled = 0
+        if self._rate is not None and self._max_rate is not None:
+            self._rate = min(self._max_rate, self._rate + self._max_rate / 100)
+
+    def throttle(self, sent: float, retry_after: float | None = None):
+        now = time.monotonic()
+        if sent < self._throttled_at:
+            # only a longer Retry-After of the server is still honoured
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            return
+
+        self._throttled_at = now
+        if retry_after is None:
+            retry_after = min(_MAX_BACKOFF, _BASE_BACKOFF * 2**self._throttled)
+        self._throttled += 1
+
+        self._paused_until = max(self._paused_until, now + retry_after)
+        if self._rate is not None and self._max_rate is not None:
+            self._rate = max(self._max_rate / 100, self._rate / 2)
+            self._tokens = min(self._tokens, 0)
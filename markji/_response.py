@@ -3,7 +3,8 @@
 # :copyright: (C) 2025 L-ING <hlf01@icloud.com>
 # :license: MIT, see LICENSE for more details.
 
-from typing import Any
+import json
+from typing import Any, Callable
 
 from aiohttp import ClientResponse, ClientResponseError
 
@@ -12,8 +13,8 @@ class _ResponseWrapper:
     def __init__(self, response: ClientResponse):
         self._response = response
 
-    async def json(self) -> Any:
-        return await self._response.json()
+    async def json(self, loads: Callable[[str], Any] = json.loads) -> Any:
+        return await self._response.json(loads=loads)
 
     async def raise_for_status(self):
         response = self._response
@@ -0,0 +1,98 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+from dataclasses import dataclass
+from typing import Sequence, TypeVar
+
+from markji.types.chapter import Chapter, ChapterSet
+
+_K = TypeVar("_K", tuple[str], tuple[str, str])
+
+
+@dataclass
+class _Entry:
+    revision: int
+    # False after a write changed the object without returning it,
+    # the ids are still right but the revision is only a lower bound
+    exact: bool
+    ids: list[str]
+
+
+def _drop(entries: dict[_K, _Entry], prefix: tuple):
+    for key in [key for key in entries if key[: len(prefix)] == prefix]:
+        del entries[key]
+
+
+class _StateTracker:
+    # local model of chapter sets and chapters folded from responses,
+    # lets writes skip the reads they need for a revision or an order
+    def __init__(self, enabled: bool):
+        self._enabled = enabled
+        self._chapter_sets: dict[tuple[str], _Entry] = {}
+        self._chapters: dict[tuple[str, str], _Entry] = {}
+
+    def chapter_set(self, deck_id: str) -> _Entry | None:
+        return self._chapter_sets.get((deck_id,))
+
+    def chapter(self, deck_id: str, chapter_id: str) -> _Entry | None:
+        return self._chapters.get((deck_id, chapter_id))
+
+    def chapter_set_revision(self, deck_id: str) -> int | None:
+        entry = self.chapter_set(deck_id)
+        return entry.revision if entry is not None and entry.exact else None
+
+    def chapter_revision(self, deck_id: str, chapter_id: str) -> int | None:
+        entry = self.chapter(deck_id, chapter_id)
+        return entry.revision if entry is not None and entry.exact else None
+
+    def _fold(self, entries: dict, key: tuple, revision: int, ids: Sequence[str]):
+        if not self._enabled:
+            return
+
+        entry = entries.get(key)
+        # responses may arrive out of order, keep the newest one
+        if (
+            entry is None
+            or revision > entry.revision
+            or (revision == entry.revision and entry.exact)
+        ):
+            entries[key] = _Entry(revision, True, list(ids))
+
+    def fold_chapter_set(self, deck_id: str, chapter_set: ChapterSet):
+        self._fold(
+            self._chapter_sets,
+            (deck_id,),
+            chapter_set.revision,
+            chapter_set.chapter_ids,
+        )
+
+    def fold_chapter(self, deck_id: str, chapter: Chapter):
+        self._fold(
+            self._chapters, (deck_id, chapter.id), chapter.revision, chapter.card_ids
+        )
+
+    def _insert(self, entry: _Entry | None, id: str, order: int):
+        if entry is not None and id not in entry.ids:
+            entry.ids.insert(order, id)
+            entry.exact = False
+
+    def insert_chapter(self, deck_id: str, chapter_id: str, order: int):
+        self._insert(self.chapter_set(deck_id), chapter_id, order)
+
+    def insert_card(self, deck_id: str, chapter_id: str, card_id: str, order: int):
+        self._insert(self.chapter(deck_id, chapter_id), card_id, order)
+
+    def invalidate(self, *tags: tuple):
+        # same tags as the response cache, e.g. ("chapter", deck_id)
+        # drops every tracked chapter of the deck
+        for kind, *prefix in tags:
+            if kind == "chapters":
+                _drop(self._chapter_sets, tuple(prefix))
+            elif kind == "chapter":
+                _drop(self._chapters, tuple(prefix))
+
+    def clear(self):
+        self._chapter_sets.clear()
+        self._chapters.clear()
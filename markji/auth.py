@@ -3,24 +3,151 @@
 # :copyright: (C) 2025 L-ING <hlf01@icloud.com>
 # :license: MIT, see LICENSE for more details.
 
+import asyncio
+import contextlib
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import AsyncContextManager, AsyncGenerator
+
 from aiohttp import ClientSession
 
 from markji._const import _API_URL, _LOGIN_ROUTE
 from markji._response import _ResponseWrapper
 from markji.types._form import _LoginForm
 
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_file(fd: int):
+        # LK_LOCK gives up after 10 seconds
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                pass
+
+    def _unlock_file(fd: int):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_file(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_file(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class TokenStore(ABC):
+    """
+    令牌存储
+
+    继承并实现 get 和 set 以使用自定义存储，
+    多个进程共享存储时还需实现 lock，保证同时只有一个进程登陆
+    """
+
+    @abstractmethod
+    async def get(self) -> str | None:
+        """
+        读取令牌
+
+        :return: 用户令牌，不存在时为 None
+        :rtype: str | None
+        """
+
+    @abstractmethod
+    async def set(self, token: str):
+        """
+        保存令牌
+
+        :param str token: 用户令牌
+        """
+
+    def lock(self) -> AsyncContextManager:
+        """
+        获取登陆锁
+
+        默认不加锁
+
+        :return: 异步上下文管理器，退出时释放锁
+        :rtype: AsyncContextManager
+        """
+        return contextlib.nullcontext()
+
+
+class FileTokenStore(TokenStore):
+    """
+    文件令牌存储
+    """
+
+    def __init__(self, path: str):
+        """
+        文件令牌存储
+
+        令牌保存在文件中，只有当前用户可读写，
+        登陆时锁住同目录下的 .lock 文件，同一台机器上的多个进程只有一个会登陆
+
+        :param str path: 文件路径
+
+        .. code-block:: python
+
+            from markji.auth import Auth, FileTokenStore
+
+            auth = Auth("username", "password", FileTokenStore("token"))
+            token = await auth.login()
+        """
+        self._path = path
+
+    async def get(self) -> str | None:
+        try:
+            with open(self._path, "r") as f:
+                token = f.read().strip()
+        except FileNotFoundError:
+            return None
+
+        return token or None
+
+    async def set(self, token: str):
+        # write then rename, readers never see a partial token
+        tmp = f"{self._path}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(token)
+        os.replace(tmp, self._path)
+
+    @contextlib.asynccontextmanager
+    async def lock(self) -> AsyncGenerator[None, None]:
+        fd = os.open(f"{self._path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            await asyncio.to_thread(_lock_file, fd)
+            try:
+                yield
+            finally:
+                _unlock_file(fd)
+        finally:
+            os.close(fd)
+
 
 class Auth:
     """
     登陆认证
     """
 
-    def __init__(self, username: str, password: str):
+    def __init__(self, username: str, password: str, store: TokenStore | None = None):
         """
         登陆认证
 
+        设置令牌存储后优先使用已保存的令牌，登陆后保存新的令牌
+
+        传入 `markji.Markji` 后，请求因令牌失效被拒绝时自动重新登陆
+
         :param str username: 用户名（手机号、邮箱）
         :param str password: 密码
+        :param TokenStore | None store: 令牌存储，None 为不保存
 
         .. code-block:: python
 
@@ -31,17 +158,35 @@ class Auth:
         """
         self._username = username
         self._password = password
+        self._store = store
 
-    async def login(self) -> str:
+    async def login(self, expired: str | None = None) -> str:
         """
         登陆
 
         获取用户token
 
+        设置令牌存储时，存储中有令牌且不是失效的令牌则直接返回，否则登陆并保存
+
+        :param str | None expired: 已失效的令牌
         :return: 用户token
         :rtype: str
         :raises aiohttp.ClientResponseError: 登陆失败
         """
+        store = self._store
+        if store is None:
+            return await self._login()
+
+        # only one process logs in, the others read the token it saved
+        async with store.lock():
+            token = await store.get()
+            if token is None or token == expired:
+                token = await self._login()
+                await store.set(token)
+
+        return token
+
+    async def _login(self) -> str:
         async with ClientSession(base_url=_API_URL) as session:
             async with session.post(
                 _LOGIN_ROUTE,
@@ -0,0 +1,498 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+import asyncio
+import os
+import sqlite3
+import threading
+from typing import Any, Iterable, Self
+
+from markji import Markji
+from markji._json import _dumps, _loads
+from markji.types import CardID, CardRootID, ChapterID, DeckID, File, FolderID
+from markji.types.card import Card
+from markji.types.chapter import Chapter, ChapterSet
+from markji.types.deck import DeckInfo
+from markji.types.folder import Folder, RootFolder
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    id TEXT PRIMARY KEY,
+    parent_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS decks (
+    id TEXT PRIMARY KEY,
+    folder_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS decks_folder_id ON decks (folder_id);
+CREATE TABLE IF NOT EXISTS chapter_sets (
+    deck_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chapters (
+    id TEXT PRIMARY KEY,
+    deck_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chapters_deck_id ON chapters (deck_id);
+CREATE TABLE IF NOT EXISTS cards (
+    id TEXT PRIMARY KEY,
+    deck_id TEXT NOT NULL,
+    chapter_id TEXT NOT NULL,
+    root_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cards_deck_id ON cards (deck_id);
+CREATE INDEX IF NOT EXISTS cards_chapter_id ON cards (chapter_id);
+CREATE INDEX IF NOT EXISTS cards_root_id ON cards (root_id);
+CREATE TABLE IF NOT EXISTS files (
+    id TEXT NOT NULL,
+    card_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (card_id, id)
+);
+CREATE INDEX IF NOT EXISTS files_id ON files (id);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _text(obj: Any) -> str:
+    text = _dumps(obj)
+    return text.decode() if isinstance(text, bytes) else text
+
+
+class Mirror:
+    """
+    本地镜像
+
+    在 SQLite 数据库中保存文件夹、卡组、章节、卡片和文件，读取时不发送请求
+    """
+
+    def __init__(self, path: str | os.PathLike = ":memory:", batch_size: int = 500):
+        """
+        本地镜像
+
+        通过 sync 从客户端获取账户中变化的对象并写入数据库，
+        也可以通过 upsert 写入 `markji.Markji.export_account` 导出的记录
+
+        使用完毕后调用 close 关闭，或使用 with 自动关闭
+
+        :param str | os.PathLike path: 数据库文件路径，":memory:" 为内存数据库
+        :param int batch_size: 同步时每次写入的记录数
+        :raises ValueError: 批量参数错误
+
+        .. code-block:: python
+
+            from markji.mirror import Mirror
+
+            with Mirror("markji.db") as mirror:
+                await mirror.sync(client)
+                cards = mirror.list_cards(chapter_id)
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size 必须大于等于 1")
+
+        # batches of a sync are written in a worker thread
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._batch_size = batch_size
+        # readers are not blocked by a sync in progress
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """
+        关闭数据库
+        """
+        with self._lock:
+            self._connection.close()
+
+    async def sync(
+        self, client: Markji, concurrency: int = 4, chunk_size: int = 500
+    ) -> int:
+        """
+        同步镜像
+
+        与上次同步时的修订版本比较，只获取并写入变化的对象，删除已删除的对象，
+        第一次同步时获取整个账户，获取方式见 `markji.Markji.sync_records`
+
+        记录按 batch_size 分批写入，同步失败时已写入的记录保留，重新同步即可继续
+
+        :param Markji client: 客户端
+        :param int concurrency: 最大并发数
+        :param int chunk_size: 每次查询的卡片数
+        :return: 写入的记录数
+        :rtype: int
+        :raises ValueError: 并发数错误
+        :raises ValueError: 分批参数错误
+        :raises ExceptionGroup: 同步失败
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM state WHERE key = 'watermarks'"
+            ).fetchone()
+        writer = _MirrorWriter(self, self._batch_size)
+        state = await client.sync_records(
+            writer.write,
+            _loads(row[0]) if row is not None else None,
+            concurrency,
+            chunk_size,
+        )
+        await writer.flush()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO state (key, value) VALUES ('watermarks', ?)",
+                (_text(state),),
+            )
+
+        return writer.count
+
+    def upsert(self, records: Iterable[dict]):
+        """
+        批量写入记录
+
+        记录格式与 `markji.Markji.export_account` 导出的每一行相同，按顺序在一个事务中写入，
+        data 为 null 的记录删除对应的对象和其下的所有对象，
+        写入章节时删除不在章节 card_ids 中的卡片
+
+        可以在其他线程中调用，与读取互斥
+
+        :param Iterable[dict] records: 记录
+        """
+        with self._lock, self._connection:
+            cards: list[dict] = []
+            for record in records:
+                # runs of cards are written together
+                if record["type"] == "card" and record["data"] is not None:
+                    cards.append(record)
+                    continue
+
+                self._upsert_cards(cards)
+                cards = []
+                self._apply(record)
+            self._upsert_cards(cards)
+
+    def _apply(self, record: dict):
+        kind = record["type"]
+        id = record["id"]
+        parent_id = record["parent_id"]
+        data = record["data"]
+        execute = self._connection.execute
+
+        if data is None:
+            if kind == "folder":
+                execute("DELETE FROM folders WHERE id = ?", (id,))
+            elif kind == "deck":
+                execute(
+                    "DELETE FROM files WHERE card_id IN "
+                    "(SELECT id FROM cards WHERE deck_id = ?)",
+                    (id,),
+                )
+                execute("DELETE FROM cards WHERE deck_id = ?", (id,))
+                execute("DELETE FROM chapters WHERE deck_id = ?", (id,))
+                execute("DELETE FROM chapter_sets WHERE deck_id = ?", (id,))
+                execute("DELETE FROM decks WHERE id = ?", (id,))
+            elif kind == "chapter":
+                execute(
+                    "DELETE FROM files WHERE card_id IN "
+                    "(SELECT id FROM cards WHERE chapter_id = ?)",
+                    (id,),
+                )
+                execute("DELETE FROM cards WHERE chapter_id = ?", (id,))
+                execute("DELETE FROM chapters WHERE id = ?", (id,))
+            elif kind == "card":
+                execute("DELETE FROM files WHERE card_id = ?", (id,))
+                execute("DELETE FROM cards WHERE id = ?", (id,))
+            return
+
+        if kind == "folder":
+            execute(
+                "INSERT OR REPLACE INTO folders (id, parent_id, data) VALUES (?, ?, ?)",
+                (id, parent_id, _text(data)),
+            )
+        elif kind == "deck":
+            execute(
+                "INSERT OR REPLACE INTO decks (id, folder_id, data) VALUES (?, ?, ?)",
+                (id, parent_id, _text(data)),
+            )
+        elif kind == "chapterset":
+            execute(
+                "INSERT OR REPLACE INTO chapter_sets (deck_id, data) VALUES (?, ?)",
+                (parent_id, _text(data)),
+            )
+        elif kind == "chapter":
+            execute(
+                "INSERT OR REPLACE INTO chapters (id, deck_id, data) VALUES (?, ?, ?)",
+                (id, parent_id, _text(data)),
+            )
+            # deleted, or moved to a chapter written later
+            card_ids = set(data["card_ids"])
+            stale = [
+                (card_id,)
+                for card_id, in execute(
+                    "SELECT id FROM cards WHERE chapter_id = ?", (id,)
+                )
+                if card_id not in card_ids
+            ]
+            self._connection.executemany("DELETE FROM files WHERE card_id = ?", stale)
+            self._connection.executemany("DELETE FROM cards WHERE id = ?", stale)
+
+    def _upsert_cards(self, records: list[dict]):
+        if not records:
+            return
+
+        executemany = self._connection.executemany
+        executemany(
+            "INSERT OR REPLACE INTO cards (id, deck_id, chapter_id, root_id, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    record["id"],
+                    record["data"]["deck_id"],
+                    record["parent_id"],
+                    record["data"]["root_id"],
+                    _text(record["data"]),
+                )
+                for record in records
+            ),
+        )
+        executemany(
+            "DELETE FROM files WHERE card_id = ?",
+            ((record["id"],) for record in records),
+        )
+        executemany(
+            "INSERT OR REPLACE INTO files (id, card_id, data) VALUES (?, ?, ?)",
+            (
+                (file["id"], record["id"], _text(file))
+                for record in records
+                for file in record["data"]["files"]
+            ),
+        )
+
+    def _select(self, sql: str, *params: Any) -> list[dict]:
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return [_loads(data) for data, in rows]
+
+    def get_folder(self, folder_id: FolderID | str) -> Folder | RootFolder | None:
+        """
+        获取文件夹
+
+        :param FolderID | str folder_id: 文件夹ID
+        :return: 文件夹，不存在时为 None
+        :rtype: Folder | RootFolder | None
+        """
+        for folder in self._select("SELECT data FROM folders WHERE id = ?", folder_id):
+            if "parent_id" in folder:
+                return Folder.from_dict(folder)
+            else:
+                return RootFolder.from_dict(folder)
+
+        return None
+
+    def list_folders(self) -> list[Folder]:
+        """
+        获取所有文件夹
+
+        :return: 按根文件夹中的顺序排列的文件夹列表
+        :rtype: list[Folder]
+        """
+        folders = {
+            folder["id"]: Folder.from_dict(folder)
+            for folder in self._select(
+                "SELECT data FROM folders WHERE parent_id IS NOT NULL"
+            )
+        }
+        for root_folder in self._select(
+            "SELECT data FROM folders WHERE parent_id IS NULL"
+        ):
+            order = [item["object_id"] for item in root_folder["items"]]
+            return [folders[id] for id in order if id in folders]
+
+        return list(folders.values())
+
+    def get_deck(self, deck_id: DeckID | str) -> DeckInfo | None:
+        """
+        获取卡组
+
+        :param DeckID | str deck_id: 卡组ID
+        :return: 卡组，不存在时为 None
+        :rtype: DeckInfo | None
+        """
+        for deck in self._select("SELECT data FROM decks WHERE id = ?", deck_id):
+            return DeckInfo.from_dict(deck)
+
+        return None
+
+    def list_decks(self, folder_id: FolderID | str) -> list[DeckInfo]:
+        """
+        获取文件夹的所有卡组
+
+        :param FolderID | str folder_id: 文件夹ID
+        :return: 按文件夹中的顺序排列的卡组列表
+        :rtype: list[DeckInfo]
+        """
+        decks = {
+            deck["id"]: DeckInfo.from_dict(deck)
+            for deck in self._select(
+                "SELECT data FROM decks WHERE folder_id = ?", folder_id
+            )
+        }
+        for folder in self._select("SELECT data FROM folders WHERE id = ?", folder_id):
+            order = [item["object_id"] for item in folder["items"]]
+            return [decks[id] for id in order if id in decks]
+
+        return list(decks.values())
+
+    def get_chapter_set(self, deck_id: DeckID | str) -> ChapterSet | None:
+        """
+        获取章节集合
+
+        :param DeckID | str deck_id: 卡组ID
+        :return: 章节集合，不存在时为 None
+        :rtype: ChapterSet | None
+        """
+        for chapter_set in self._select(
+            "SELECT data FROM chapter_sets WHERE deck_id = ?", deck_id
+        ):
+            return ChapterSet.from_dict(chapter_set)
+
+        return None
+
+    def get_chapter(self, chapter_id: ChapterID | str) -> Chapter | None:
+        """
+        获取章节
+
+        :param ChapterID | str chapter_id: 章节ID
+        :return: 章节，不存在时为 None
+        :rtype: Chapter | None
+        """
+        for chapter in self._select(
+            "SELECT data FROM chapters WHERE id = ?", chapter_id
+        ):
+            return Chapter.from_dict(chapter)
+
+        return None
+
+    def list_chapters(self, deck_id: DeckID | str) -> list[Chapter]:
+        """
+        获取卡组的所有章节
+
+        :param DeckID | str deck_id: 卡组ID
+        :return: 按章节集合中的顺序排列的章节列表
+        :rtype: list[Chapter]
+        """
+        chapters = {
+            chapter["id"]: Chapter.from_dict(chapter)
+            for chapter in self._select(
+                "SELECT data FROM chapters WHERE deck_id = ?", deck_id
+            )
+        }
+        chapter_set = self.get_chapter_set(deck_id)
+        if chapter_set is None:
+            return list(chapters.values())
+
+        return [chapters[id] for id in chapter_set.chapter_ids if id in chapters]
+
+    def get_card(self, card_id: CardID | str) -> Card | None:
+        """
+        获取卡片
+
+        :param CardID | str card_id: 卡片ID
+        :return: 卡片，不存在时为 None
+        :rtype: Card | None
+        """
+        for card in self._select("SELECT data FROM cards WHERE id = ?", card_id):
+            return Card.from_dict(card)
+
+        return None
+
+    def list_cards(self, chapter_id: ChapterID | str) -> list[Card]:
+        """
+        获取章节的所有卡片
+
+        :param ChapterID | str chapter_id: 章节ID
+        :return: 按章节中的顺序排列的卡片列表
+        :rtype: list[Card]
+        """
+        cards = {
+            card["id"]: Card.from_dict(card)
+            for card in self._select(
+                "SELECT data FROM cards WHERE chapter_id = ?", chapter_id
+            )
+        }
+        chapter = self.get_chapter(chapter_id)
+        if chapter is None:
+            return list(cards.values())
+
+        return [cards[id] for id in chapter.card_ids if id in cards]
+
+    def find_cards(self, root_id: CardRootID | str) -> list[Card]:
+        """
+        获取同一根卡片的所有卡片
+
+        :param CardRootID | str root_id: 卡片根ID
+        :return: 卡片列表
+        :rtype: list[Card]
+        """
+        return [
+            Card.from_dict(card)
+            for card in self._select(
+                "SELECT data FROM cards WHERE root_id = ?", root_id
+            )
+        ]
+
+    def list_files(self, card_id: CardID | str) -> list[File]:
+        """
+        获取卡片的所有文件
+
+        :param CardID | str card_id: 卡片ID
+        :return: 文件列表
+        :rtype: list[File]
+        """
+        return [
+            File.from_dict(file)
+            for file in self._select(
+                "SELECT data FROM files WHERE card_id = ?", card_id
+            )
+        ]
+
+
+class _MirrorWriter:
+    # collects the records of a sync and writes them in batches
+    def __init__(self, mirror: Mirror, batch_size: int):
+        self._mirror = mirror
+        self._batch_size = batch_size
+        self._records: list[dict] = []
+        # batches are written one at a time, in order
+        self._lock = asyncio.Lock()
+        self.count = 0
+
+    async def write(self, record: dict):
+        self._records.append(record)
+        self.count += 1
+        if len(self._records) >= self._batch_size:
+            await self.flush()
+
+    async def flush(self):
+        records, self._records = self._records, []
+        if not records:
+            return
+
+        # sqlite and json encoding stay off the event loop
+        async with self._lock:
+            await asyncio.to_thread(self._mirror.upsert, records)
@@ -0,0 +1,240 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+
+from markji.types import CardID, ChapterID, DeckID
+from markji.types.card import Card
+from markji.types.chapter import Chapter
+
+
+@dataclass
+class ChapterLayout:
+    """
+    章节布局
+
+    :param str name: 章节名
+    :param list[str] contents: 按顺序排列的卡片内容
+    """
+
+    name: str
+    contents: list[str]
+
+
+@dataclass
+class ChapterPlan:
+    """
+    章节计划
+
+    :param ChapterID | None chapter_id: 复用的章节ID，None 为新建
+    :param str name: 章节名
+    :param bool rename: 是否需要重命名
+    :param list[CardID | int] cards: 卡片的最终顺序，int 为 new_cards 中的下标
+    :param list[str] new_cards: 需要新建的卡片内容
+    :param bool sort: 是否需要排序卡片
+    """
+
+    chapter_id: ChapterID | None
+    name: str
+    rename: bool = False
+    cards: list[CardID | int] = field(default_factory=list)
+    new_cards: list[str] = field(default_factory=list)
+    sort: bool = False
+
+
+@dataclass
+class DeckPlan:
+    """
+    卡组计划
+
+    由 `markji.Markji.plan_deck` 生成，由 `markji.Markji.apply_deck_plan` 执行
+
+    :param DeckID deck_id: 卡组ID
+    :param list[ChapterPlan] chapters: 按最终顺序排列的章节
+    :param dict[CardID, str] edit_cards: 需要编辑的卡片
+    :param list[tuple[ChapterID, int, list[CardID]]] move_cards: 需要移动的卡片，
+        原章节ID, 目标章节在 chapters 中的下标, 卡片ID列表
+    :param list[tuple[ChapterID, CardID]] delete_cards: 需要删除的卡片
+    :param list[ChapterID] delete_chapters: 需要删除的章节
+    :param bool sort_chapters: 是否需要排序章节
+    """
+
+    deck_id: DeckID
+    chapters: list[ChapterPlan] = field(default_factory=list)
+    edit_cards: dict[CardID, str] = field(default_factory=dict)
+    move_cards: list[tuple[ChapterID, int, list[CardID]]] = field(default_factory=list)
+    delete_cards: list[tuple[ChapterID, CardID]] = field(default_factory=list)
+    delete_chapters: list[ChapterID] = field(default_factory=list)
+    sort_chapters: bool = False
+
+    def __len__(self) -> int:
+        """
+        请求数
+        """
+        return (
+            sum(
+                (chapter.chapter_id is None)
+                + chapter.rename
+                + len(chapter.new_cards)
+                + chapter.sort
+                for chapter in self.chapters
+            )
+            + len(self.edit_cards)
+            + len(self.move_cards)
+            + len(self.delete_cards)
+            + len(self.delete_chapters)
+            + self.sort_chapters
+        )
+
+
+def _validate(layout: list[ChapterLayout]):
+    for chapter in layout:
+        if len(chapter.name) < 1 or len(chapter.name) > 48:
+            raise ValueError("章节名必须在 1 到 48 个字符之间")
+        for content in chapter.contents:
+            if len(content) < 1 or len(content) > 2500:
+                raise ValueError("卡片内容必须在 1 到 2500 个字符之间")
+
+
+def _diff(
+    deck_id: DeckID,
+    chapters: list[Chapter],
+    cards: dict[CardID, Card],
+    layout: list[ChapterLayout],
+) -> DeckPlan:
+    # chapters: live chapters in deck order, cards: their live cards
+    plan = DeckPlan(deck_id)
+
+    # chapters with the same name are kept, the other live chapters are
+    # renamed in order, desired chapters left over are created and live
+    # chapters left over are deleted
+    by_name: dict[str, deque[Chapter]] = defaultdict(deque)
+    for chapter in chapters:
+        by_name[chapter.name].append(chapter)
+
+    targets = [
+        by_name[chapter.name].popleft() if by_name[chapter.name] else None
+        for chapter in layout
+    ]
+    kept = {target.id for target in targets if target is not None}
+    spare = deque(chapter for chapter in chapters if chapter.id not in kept)
+    for target, chapter in zip(targets, layout):
+        if target is None and spare:
+            plan.chapters.append(ChapterPlan(spare.popleft().id, chapter.name, True))
+        else:
+            chapter_id = target.id if target is not None else None
+            plan.chapters.append(ChapterPlan(chapter_id, chapter.name))
+    plan.delete_chapters = [chapter.id for chapter in spare]
+
+    # live cards by content and chapter, in deck order
+    location: dict[CardID, ChapterID] = {}
+    pool: dict[str, dict[ChapterID, deque[CardID]]] = defaultdict(dict)
+    for chapter in chapters:
+        for card_id in chapter.card_ids:
+            card = cards.get(card_id)
+            if card is not None:
+                location[card_id] = chapter.id
+                pool[card.content].setdefault(chapter.id, deque()).append(card_id)
+
+    def take(content: str, chapter_id: ChapterID | None) -> CardID | None:
+        # a card of the given chapter, or of any chapter when None
+        groups = pool.get(content, {})
+        if chapter_id is not None:
+            queue = groups.get(chapter_id)
+            return queue.popleft() if queue else None
+
+        for queue in groups.values():
+            if queue:
+                return queue.popleft()
+
+        return None
+
+    # same content in the same chapter stays where it is
+    slots = [
+        [
+            (
+                take(content, chapter_plan.chapter_id)
+                if chapter_plan.chapter_id is not None
+                else None
+            )
+            for content in chapter.contents
+        ]
+        for chapter_plan, chapter in zip(plan.chapters, layout)
+    ]
+    # same content in another chapter is moved
+    for chapter_slots, chapter in zip(slots, layout):
+        for position, content in enumerate(chapter.contents):
+            if chapter_slots[position] is None:
+                chapter_slots[position] = take(content, None)
+
+    taken = {
+        card_id
+        for chapter_slots in slots
+        for card_id in chapter_slots
+        if card_id is not None
+    }
+    live = {chapter.id: chapter.card_ids for chapter in chapters}
+    # other cards of the same chapter are edited, the rest is created
+    for chapter_plan, chapter_slots, chapter in zip(plan.chapters, slots, layout):
+        chapter_id = chapter_plan.chapter_id
+        spare_cards = deque(
+            card_id
+            for card_id in (live[chapter_id] if chapter_id is not None else [])
+            if card_id in location and card_id not in taken
+        )
+        for card_id, content in zip(chapter_slots, chapter.contents):
+            if card_id is None and spare_cards:
+                card_id = spare_cards.popleft()
+                taken.add(card_id)
+                plan.edit_cards[card_id] = content
+
+            if card_id is None:
+                chapter_plan.cards.append(len(chapter_plan.new_cards))
+                chapter_plan.new_cards.append(content)
+            else:
+                chapter_plan.cards.append(card_id)
+
+    moves: dict[tuple[ChapterID, int], list[CardID]] = defaultdict(list)
+    for index, chapter_plan in enumerate(plan.chapters):
+        for card_id in chapter_plan.cards:
+            if (
+                isinstance(card_id, str)
+                and location[card_id] != chapter_plan.chapter_id
+            ):
+                moves[(location[card_id], index)].append(card_id)
+    plan.move_cards = [
+        (source, target, card_ids) for (source, target), card_ids in moves.items()
+    ]
+
+    # cards of deleted chapters go away with the chapter
+    deleted = set(plan.delete_chapters)
+    plan.delete_cards = [
+        (chapter_id, card_id)
+        for card_id, chapter_id in location.items()
+        if card_id not in taken and chapter_id not in deleted
+    ]
+
+    # a chapter that only lost cards keeps the order of the rest
+    incoming = {target for _, target, _ in plan.move_cards}
+    for index, chapter_plan in enumerate(plan.chapters):
+        if (
+            chapter_plan.chapter_id is None
+            or chapter_plan.new_cards
+            or index in incoming
+        ):
+            chapter_plan.sort = len(chapter_plan.cards) > 1
+        else:
+            final = set(chapter_plan.cards)
+            remaining = [
+                card_id for card_id in live[chapter_plan.chapter_id] if card_id in final
+            ]
+            chapter_plan.sort = remaining != chapter_plan.cards
+
+    remaining = [chapter.id for chapter in chapters if chapter.id not in deleted]
+    final = [chapter_plan.chapter_id for chapter_plan in plan.chapters]
+    plan.sort_chapters = len(final) > 1 and (None in final or remaining != final)
+
+    return plan
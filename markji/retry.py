@@ -0,0 +1,51 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+import random
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    重试策略
+
+    使用带随机抖动的指数退避，第 n 次重试前等待 0 到 min(max_delay, base_delay * 2^(n-1)) 秒
+
+    连接失败、连接超时和 429 时请求未被服务器处理，所有请求都会重试
+
+    连接重置、读取超时和 retry_statuses 中的状态码时请求结果未知，仅重试幂等请求
+
+    :param int max_attempts: 最大尝试次数（包含首次请求），1 为不重试
+    :param float base_delay: 基础等待时间（秒）
+    :param float max_delay: 最大等待时间（秒）
+    :param frozenset[int] retry_statuses: 可重试的状态码
+
+    .. code-block:: python
+
+        from markji import Markji
+        from markji.retry import RetryPolicy
+
+        client = Markji(token, retry=RetryPolicy(max_attempts=6))
+    """
+
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 30
+    retry_statuses: frozenset[int] = field(
+        default_factory=lambda: frozenset({500, 502, 503, 504})
+    )
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts 必须大于等于 1")
+        if self.base_delay < 0 or self.max_delay < 0:
+            raise ValueError("等待时间必须大于等于 0")
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter, attempt starts from 1
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
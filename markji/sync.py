@@ -0,0 +1,138 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+import asyncio
+import functools
+import inspect
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Iterator, Self
+
+from markji import Markji as _Markji
+
+
+class Markji:
+    """
+    同步客户端
+
+    拥有 `markji.Markji` 的所有方法，以同步方式调用
+    """
+
+    def __init__(self, token: str, **kwargs):
+        """
+        同步客户端
+
+        所有请求在同一个后台事件循环线程中运行，复用同一个连接池
+
+        通过 submit 可以同时提交多个请求，返回 concurrent.futures.Future
+
+        使用完毕后调用 close 关闭，或使用 with 自动关闭
+
+        :param str token: 用户令牌
+        :param kwargs: 传递给 `markji.Markji` 的参数
+        :raises ValueError: 参数错误
+
+        .. code-block:: python
+
+            from concurrent.futures import wait
+
+            from markji.sync import Markji
+
+            with Markji(token) as client:
+                profile = client.get_profile()
+
+                futures = [client.submit("get_deck", deck_id) for deck_id in deck_ids]
+                wait(futures)
+        """
+        self._client = _Markji(token, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="markji", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """
+        关闭客户端
+
+        关闭会话并停止后台事件循环，之后不能再发起请求
+        """
+        if self._loop.is_closed():
+            return
+
+        self._run(self._client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _run(self, coro) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def submit(self, method: str, /, *args, **kwargs) -> Future:
+        """
+        提交请求
+
+        请求在后台事件循环中并发运行，不等待结果，多次提交的请求同时进行
+
+        :param str method: `markji.Markji` 的方法名
+        :param args: 方法参数
+        :param kwargs: 方法参数
+        :return: 请求结果
+        :rtype: concurrent.futures.Future
+        :raises AttributeError: 方法不存在
+        """
+        func = getattr(self._client, method)
+        if not inspect.iscoroutinefunction(func):
+            raise AttributeError(f"{method} 不是异步方法")
+
+        return asyncio.run_coroutine_threadsafe(func(*args, **kwargs), self._loop)
+
+
+def _wrap(name: str, func: Callable) -> Callable:
+    if inspect.isasyncgenfunction(func):
+
+        @functools.wraps(func)
+        def iterate(self: Markji, *args, **kwargs) -> Iterator:
+            iterator = getattr(self._client, name)(*args, **kwargs)
+            try:
+                while True:
+                    try:
+                        yield self._run(iterator.__anext__())
+                    except StopAsyncIteration:
+                        return
+            finally:
+                if not self._loop.is_closed():
+                    self._run(iterator.aclose())
+
+        return iterate
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        def call(self: Markji, *args, **kwargs) -> Any:
+            return self._run(getattr(self._client, name)(*args, **kwargs))
+
+        return call
+
+    # synchronous methods touch state owned by the event loop thread
+    @functools.wraps(func)
+    def call_soon(self: Markji, *args, **kwargs) -> Any:
+        async def run():
+            return getattr(self._client, name)(*args, **kwargs)
+
+        return self._run(run())
+
+    return call_soon
+
+
+for _name, _func in inspect.getmembers(_Markji, inspect.isfunction):
+    if not _name.startswith("_") and _name != "close":
+        setattr(Markji, _name, _wrap(_name, _func))
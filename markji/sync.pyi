@@ -0,0 +1,338 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+# the methods of markji.Markji as attached by sync.py, keep in sync with
+# markji/__init__.py, tests/test_sync.py checks that none is missing
+
+import os
+from asyncio import AbstractEventLoop
+from concurrent.futures import Future
+from datetime import datetime
+from threading import Thread
+from typing import (
+    IO,
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Iterable,
+    Iterator,
+    Mapping,
+    Self,
+    TypeVar,
+)
+
+from markji import Markji as _Markji
+from markji.auth import Auth
+from markji.reconcile import ChapterLayout, DeckPlan
+from markji.retry import RetryPolicy
+from markji.types import (
+    CardID,
+    ChapterID,
+    DeckAccessSetting,
+    DeckAccessSettingBrief,
+    DeckAccessSettingInfo,
+    DeckID,
+    FolderID,
+    LanguageCode,
+    MaskItem,
+    Path,
+)
+from markji.types.card import Card, CardResult, File, UserID
+from markji.types.chapter import Chapter, ChapterDiff, ChapterSet
+from markji.types.deck import Deck, DeckBasic, DeckBrief, DeckForked, DeckInfo
+from markji.types.folder import Folder, FolderDiff, RootFolder
+from markji.types.user import Collaborator, Profile, User, UserBrief
+
+_T = TypeVar("_T")
+_K = TypeVar("_K", bound=str)
+
+class Markji:
+    _client: _Markji
+    _loop: AbstractEventLoop
+    _thread: Thread
+    def __init__(
+        self,
+        token: str,
+        *,
+        limit: int = ...,
+        limit_per_host: int = ...,
+        ttl_dns_cache: int | None = ...,
+        keepalive_timeout: float = ...,
+        total_timeout: float | None = ...,
+        connect_timeout: float | None = ...,
+        sock_connect_timeout: float | None = ...,
+        read_timeout: float | None = ...,
+        rate_limit: float | None = ...,
+        rate_burst: int = ...,
+        retry: RetryPolicy | None = ...,
+        cache_size: int = ...,
+        cache_ttl: float | None = ...,
+        card_cache_size: int = ...,
+        loads: Callable[[str], Any] | None = ...,
+        dumps: Callable[[Any], str | bytes] | None = ...,
+        auth: Auth | None = ...,
+        track_state: bool = ...,
+    ): ...
+    def __enter__(self) -> Self: ...
+    def __exit__(self, *_) -> None: ...
+    def close(self) -> None: ...
+    def _run(self, coro: Coroutine[Any, Any, _T]) -> _T: ...
+    def submit(self, method: str, /, *args, **kwargs) -> Future: ...
+    def clear_cache(self): ...
+    def skipped_edits(self) -> int: ...
+    def get_profile(self) -> Profile: ...
+    def query_users(self, user_ids: Iterable[UserID | int]) -> list[UserBrief]: ...
+    def search_users(
+        self, nickname: str, offset: int = ..., limit: int = ...
+    ) -> tuple[list[User], int]: ...
+    def iter_search_users(
+        self,
+        nickname: str,
+        offset: int = ...,
+        limit: int = ...,
+        count: int | None = ...,
+    ) -> Iterator[tuple[User, int, bool]]: ...
+    def search_collaborators(
+        self, deck_id: DeckID | str, keyword: str | UserID | int
+    ) -> list[Collaborator]: ...
+    def get_folder(self, folder_id: FolderID | str) -> Folder | RootFolder: ...
+    def get_root_folder(self) -> RootFolder: ...
+    def list_folders(self) -> list[Folder]: ...
+    def new_folder(self, name: str) -> Folder: ...
+    def delete_folder(self, folder_id: FolderID | str) -> RootFolder: ...
+    def rename_folder(self, folder_id: FolderID | str, name: str) -> Folder: ...
+    def sort_folders(
+        self,
+        folder_ids: Iterable[FolderID | str],
+        updated_time: datetime | None = ...,
+        root_folder_id: FolderID | str | None = ...,
+    ) -> RootFolder: ...
+    def get_deck(self, deck_id: str) -> Deck: ...
+    def list_decks(self, folder_id: FolderID | str) -> list[DeckInfo]: ...
+    def new_deck(
+        self,
+        folder_id: FolderID | str,
+        name: str,
+        description: str = ...,
+        is_private: bool = ...,
+    ) -> DeckBrief: ...
+    def delete_deck(self, deck_id: DeckID | str): ...
+    def update_deck_info(
+        self,
+        deck_id: DeckID | str,
+        name: str | None = ...,
+        description: str | None = ...,
+        is_private: bool | None = ...,
+        card_price: int | None = ...,
+    ) -> DeckBrief: ...
+    def update_deck_name(self, deck_id: DeckID | str, name: str) -> DeckBrief: ...
+    def update_deck_description(
+        self, deck_id: DeckID | str, description: str
+    ) -> DeckBrief: ...
+    def update_deck_privacy(
+        self, deck_id: DeckID | str, is_private: bool
+    ) -> DeckBrief: ...
+    def update_deck_card_price(
+        self, deck_id: DeckID | str, card_price: int
+    ) -> DeckBrief: ...
+    def update_deck_access_setting(
+        self,
+        deck_id: DeckID | str,
+        is_searchable: bool | None = ...,
+        validation_request_access: bool | None = ...,
+        validation_password: str | None = ...,
+    ) -> DeckAccessSettingBrief | DeckAccessSettingInfo | DeckAccessSetting: ...
+    def update_deck_searchable(
+        self, deck_id: DeckID | str, is_searchable: bool
+    ) -> DeckAccessSettingBrief | DeckAccessSettingInfo | DeckAccessSetting: ...
+    def update_deck_validation_request_access(
+        self, deck_id: DeckID | str, validation_request_access: bool
+    ) -> DeckAccessSettingBrief | DeckAccessSettingInfo | DeckAccessSetting: ...
+    def update_deck_validation_password(
+        self, deck_id: DeckID | str, validation_password: str
+    ) -> DeckAccessSettingInfo | DeckAccessSetting: ...
+    def sort_decks(
+        self,
+        folder_id: FolderID | str,
+        deck_ids: Iterable[DeckID | str],
+        updated_time: datetime | None = ...,
+    ) -> Folder: ...
+    def move_decks(
+        self,
+        folder_id_from: FolderID | str,
+        folder_id_to: FolderID | str,
+        deck_ids: Iterable[DeckID | str],
+        order: int | None = ...,
+    ) -> FolderDiff: ...
+    def search_decks(
+        self, keyword: str, offset: int = ..., limit: int = ..., self_only: bool = ...
+    ) -> tuple[list[DeckBasic], int]: ...
+    def iter_search_decks(
+        self,
+        keyword: str,
+        offset: int = ...,
+        limit: int = ...,
+        self_only: bool = ...,
+        count: int | None = ...,
+    ) -> Iterator[tuple[DeckBasic, int, bool]]: ...
+    def fork_deck(self, deck_id: DeckID | str) -> DeckForked: ...
+    def get_deck_access_link(self, deck_id: DeckID | str) -> str: ...
+    def get_chapter(
+        self, deck_id: DeckID | str, chapter_id: ChapterID | str
+    ) -> Chapter: ...
+    def get_chapter_set(self, deck_id: DeckID | str) -> ChapterSet: ...
+    def list_chapters(self, deck_id: DeckID | str) -> list[Chapter]: ...
+    def new_chapter(self, deck_id: DeckID | str, name: str) -> Chapter: ...
+    def delete_chapter(
+        self, deck_id: DeckID | str, chapter_id: ChapterID | str
+    ) -> ChapterSet: ...
+    def rename_chapter(
+        self, deck_id: DeckID | str, chapter_id: ChapterID | str, name: str
+    ) -> Chapter: ...
+    def sort_chapters(
+        self,
+        deck_id: DeckID | str,
+        chapter_ids: Iterable[ChapterID | str],
+        revision: int | None = ...,
+    ) -> ChapterSet: ...
+    def get_card(self, deck_id: DeckID | str, card_id: str) -> Card: ...
+    def list_cards(
+        self,
+        deck_id: DeckID | str,
+        chapter_id: ChapterID | str,
+        chunk_size: int = ...,
+        concurrency: int = ...,
+    ) -> list[Card]: ...
+    def iter_cards(
+        self,
+        deck_id: DeckID | str,
+        chapter_id: ChapterID | str,
+        chunk_size: int = ...,
+        concurrency: int = ...,
+    ) -> Iterator[Card]: ...
+    def iter_deck_cards(
+        self, deck_id: DeckID | str, chunk_size: int = ..., concurrency: int = ...
+    ) -> Iterator[tuple[Chapter, Card]]: ...
+    def new_card(
+        self,
+        deck_id: DeckID | str,
+        chapter_id: ChapterID | str,
+        content: str,
+        grammar_version: int = ...,
+    ) -> Card: ...
+    def new_cards(
+        self,
+        deck_id: DeckID | str,
+        chapter_id: ChapterID | str,
+        contents: Iterable[str],
+        grammar_version: int = ...,
+        concurrency: int = ...,
+    ) -> tuple[list[Card | BaseException], BaseException | None]: ...
+    def delete_card(
+        self, chapter_id: ChapterID | str, deck_id: DeckID | str, card_id: str
+    ) -> Chapter: ...
+    def delete_cards(
+        self,
+        deck_id: DeckID | str,
+        cards: Iterable[tuple[ChapterID | str, CardID | str]],
+        concurrency: int = ...,
+    ) -> tuple[dict[ChapterID | str, Chapter], list[BaseException | None]]: ...
+    def edit_card(
+        self,
+        deck_id: DeckID | str,
+        card_id: str,
+        content: str,
+        grammar_version: int = ...,
+        current: Card | None = ...,
+    ) -> Card: ...
+    def edit_cards(
+        self,
+        deck_id: DeckID | str,
+        contents: Mapping[_K, str],
+        grammar_version: int = ...,
+        concurrency: int = ...,
+        current: Iterable[Card] = ...,
+    ) -> list[Card | BaseException]: ...
+    def sort_cards(
+        self,
+        deck_id: DeckID | str,
+        chapter_id: ChapterID | str,
+        card_ids: Iterable[CardID | str],
+        revision: int | None = ...,
+    ) -> Chapter: ...
+    def move_cards(
+        self,
+        deck_id: DeckID | str,
+        chapter_id_from: ChapterID | str,
+        chapter_id_to: ChapterID | str,
+        card_ids: Iterable[CardID | str],
+        order: int | None = ...,
+    ) -> ChapterDiff: ...
+    def move_cards_bulk(
+        self,
+        deck_id: DeckID | str,
+        moves: Iterable[tuple[CardID | str, ChapterID | str, ChapterID | str]],
+        concurrency: int = ...,
+    ) -> tuple[dict[ChapterID | str, Chapter], list[BaseException | None]]: ...
+    def plan_deck(
+        self,
+        deck_id: DeckID | str,
+        layout: Iterable[ChapterLayout],
+        chunk_size: int = ...,
+        concurrency: int = ...,
+    ) -> DeckPlan: ...
+    def apply_deck_plan(
+        self, plan: DeckPlan, grammar_version: int = ..., concurrency: int = ...
+    ) -> list[Chapter]: ...
+    def reconcile_deck(
+        self,
+        deck_id: DeckID | str,
+        layout: Iterable[ChapterLayout],
+        grammar_version: int = ...,
+        concurrency: int = ...,
+        chunk_size: int = ...,
+    ) -> DeckPlan: ...
+    def export_account(
+        self,
+        path: str | os.PathLike,
+        concurrency: int = ...,
+        chunk_size: int = ...,
+        state_file: str | os.PathLike | None = ...,
+    ) -> int: ...
+    def sync_account(
+        self,
+        state_file: str | os.PathLike,
+        path: str | os.PathLike,
+        concurrency: int = ...,
+        chunk_size: int = ...,
+    ) -> int: ...
+    def sync_records(
+        self,
+        write: Callable[[dict], Awaitable[Any]],
+        state: dict | None = ...,
+        concurrency: int = ...,
+        chunk_size: int = ...,
+    ) -> dict: ...
+    def search_cards(
+        self,
+        keyword: str,
+        offset: int = ...,
+        limit: int = ...,
+        self_only: bool = ...,
+        deck_id: DeckID | str | None = ...,
+    ) -> tuple[list[CardResult], int]: ...
+    def iter_search_cards(
+        self,
+        keyword: str,
+        offset: int = ...,
+        limit: int = ...,
+        self_only: bool = ...,
+        deck_id: DeckID | str | None = ...,
+        count: int | None = ...,
+    ) -> Iterator[tuple[CardResult, int, bool]]: ...
+    def upload_file(self, path: Path | str | IO[bytes]) -> File: ...
+    def tts(self, text: str, lang: LanguageCode | str) -> File: ...
+    def upload_mask(self, mask: Iterable[MaskItem | dict] | Path | str) -> File: ...
@@ -13,14 +13,15 @@ from markji.auth import Auth
 
 
 class AsyncTestCase(unittest.IsolatedAsyncioTestCase):
+    token: str
     client: Markji
 
     @classmethod
     def setUpClass(cls):
         warnings.simplefilter("ignore", ResourceWarning)
 
-        token = asyncio.run(Auth(ENV.username, ENV.password).login())
-        cls.client = Markji(token)
+        cls.token = asyncio.run(Auth(ENV.username, ENV.password).login())
+        cls.client = Markji(cls.token)
 
 
 class Env:
@@ -3,10 +3,14 @@
 # :copyright: (C) 2025 L-ING <hlf01@icloud.com>
 # :license: MIT, see LICENSE for more details.
 
+import asyncio
+import os
+import tempfile
 import unittest
 import warnings
 
-from markji.auth import Auth
+from markji import Markji
+from markji.auth import Auth, FileTokenStore
 from tests import ENV, AsyncTestCase
 
 
@@ -19,6 +23,33 @@ class TestAuth(AsyncTestCase):
         auth = Auth(ENV.username, ENV.password)
         await auth.login()
 
+    async def test_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "token")
+            tokens = await asyncio.gather(
+                *(
+                    Auth(ENV.username, ENV.password, FileTokenStore(path)).login()
+                    for _ in range(3)
+                )
+            )
+            self.assertEqual(len(set(tokens)), 1)
+
+            store = FileTokenStore(path)
+            self.assertEqual(await store.get(), tokens[0])
+
+            await store.set("t_token")
+            auth = Auth(ENV.username, ENV.password, store)
+            self.assertEqual(await auth.login(), "t_token")
+            token = await auth.login("t_token")
+            self.assertNotEqual(token, "t_token")
+            self.assertEqual(await store.get(), token)
+
+    async def test_relogin(self):
+        auth = Auth(ENV.username, ENV.password)
+        async with Markji("t_token", auth=auth) as client:
+            await client.get_profile()
+            self.assertNotEqual(client._token, "t_token")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,9 +4,12 @@
 # :license: MIT, see LICENSE for more details.
 
 import unittest
+from typing import cast
 
 from aiohttp import ClientResponseError
 
+from markji import Markji
+from markji.types.card import Card
 from tests import AsyncTestCase
 
 
@@ -43,6 +46,52 @@ class TestCard(AsyncTestCase):
         cards = await self.client.list_cards(deck.id, chapter.id)
         self.assertEqual(len(cards), 1)
 
+    async def test_list_chunk(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+
+        chapter_name = "t_chapter"
+        chapter = await self.client.new_chapter(deck.id, chapter_name)
+        card_contents = [f"t_card_{i}" for i in range(5)]
+        await self.client.new_cards(deck.id, chapter.id, card_contents)
+
+        cards = await self.client.list_cards(deck.id, chapter.id, 2, 2)
+        self.assertEqual([card.content for card in cards], card_contents)
+
+        cards = [card async for card in self.client.iter_cards(deck.id, chapter.id, 2)]
+        self.assertEqual([card.content for card in cards], card_contents)
+
+        with self.assertRaises(ValueError):
+            await self.client.list_cards(deck.id, chapter.id, 0)
+
+        with self.assertRaises(ValueError):
+            await self.client.list_cards(deck.id, chapter.id, 2, 0)
+
+    async def test_iter_deck(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+
+        expected = []
+        for i in range(3):
+            chapter = await self.client.new_chapter(deck.id, f"t_chapter_{i}")
+            card_contents = [f"t_card_{i}_{j}" for j in range(i + 1)]
+            await self.client.new_cards(deck.id, chapter.id, card_contents)
+            expected.extend((chapter.id, content) for content in card_contents)
+
+        cards = [
+            (chapter.id, card.content)
+            async for chapter, card in self.client.iter_deck_cards(deck.id, 2, 2)
+        ]
+        self.assertEqual(cards, expected)
+
     async def test_new(self):
         folder_name = "t_folder"
         folder = await self.client.new_folder(folder_name)
@@ -66,6 +115,35 @@ class TestCard(AsyncTestCase):
         with self.assertRaises(ValueError):
             await self.client.new_card(deck.id, chapter.id, card_content)
 
+    async def test_new_bulk(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+
+        chapter_name = "t_chapter"
+        chapter = await self.client.new_chapter(deck.id, chapter_name)
+        card_contents = [f"t_card_{i}" for i in range(5)]
+        card_contents.insert(2, "")
+        results, error = await self.client.new_cards(
+            deck.id, chapter.id, card_contents, concurrency=3
+        )
+
+        self.assertIsNone(error)
+        self.assertIsInstance(results[2], ValueError)
+        cards = await self.client.list_cards(deck.id, chapter.id)
+        self.assertEqual(
+            [card.content for card in cards],
+            [content for content in card_contents if content],
+        )
+
+        with self.assertRaises(ValueError):
+            await self.client.new_cards(
+                deck.id, chapter.id, card_contents, concurrency=0
+            )
+
     async def test_delete(self):
         folder_name = "t_folder"
         folder = await self.client.new_folder(folder_name)
@@ -84,6 +162,37 @@ class TestCard(AsyncTestCase):
         with self.assertRaises(ClientResponseError):
             await self.client.get_card(deck.id, card.id)
 
+    async def test_delete_bulk(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+
+        cards = []
+        chapter_ids = []
+        for i in range(2):
+            chapter = await self.client.new_chapter(deck.id, f"t_chapter_{i}")
+            chapter_ids.append(chapter.id)
+            card_contents = [f"t_card_{i}_{j}" for j in range(3)]
+            results, _ = await self.client.new_cards(deck.id, chapter.id, card_contents)
+            for card in results:
+                cards.append((chapter.id, cast(Card, card).id))
+
+        chapters, errors = await self.client.delete_cards(
+            deck.id, cards[1:], concurrency=2
+        )
+        self.assertEqual(errors, [None] * 5)
+        self.assertEqual(chapters[chapter_ids[0]].card_ids, [cards[0][1]])
+        self.assertEqual(chapters[chapter_ids[1]].card_ids, [])
+
+        # a failed card keeps the state of the others
+        chapters, errors = await self.client.delete_cards(deck.id, cards[:2])
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], ClientResponseError)
+        self.assertEqual(chapters[chapter_ids[0]].card_ids, [])
+
     async def test_edit(self):
         folder_name = "t_folder"
         folder = await self.client.new_folder(folder_name)
@@ -110,6 +219,72 @@ class TestCard(AsyncTestCase):
         with self.assertRaises(ValueError):
             await self.client.edit_card(deck.id, card.id, new_content)
 
+    async def test_edit_bulk(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+
+        chapter_name = "t_chapter"
+        chapter = await self.client.new_chapter(deck.id, chapter_name)
+        card_contents = [f"t_card_{i}" for i in range(3)]
+        cards, _ = await self.client.new_cards(deck.id, chapter.id, card_contents)
+        card_ids = [cast(Card, card).id for card in cards]
+
+        card_contents = {
+            card_id: f"t_card_new_{i}" for i, card_id in enumerate(card_ids)
+        }
+        card_contents[card_ids[1]] = ""
+        results = await self.client.edit_cards(deck.id, card_contents, concurrency=2)
+
+        self.assertEqual(cast(Card, results[0]).content, "t_card_new_0")
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(cast(Card, results[2]).content, "t_card_new_2")
+
+        with self.assertRaises(ValueError):
+            await self.client.edit_cards(deck.id, card_contents, concurrency=0)
+
+    async def test_edit_skip(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+
+        chapter_name = "t_chapter"
+        chapter = await self.client.new_chapter(deck.id, chapter_name)
+        card_content = "t_card"
+        card = await self.client.new_card(deck.id, chapter.id, card_content)
+
+        skipped = self.client.skipped_edits()
+        result = await self.client.edit_card(
+            deck.id, card.id, card_content, current=card
+        )
+        self.assertIs(result, card)
+        self.assertEqual(self.client.skipped_edits(), skipped + 1)
+
+        card_content_new = "t_card_new"
+        result = await self.client.edit_card(
+            deck.id, card.id, card_content_new, current=card
+        )
+        self.assertEqual(result.content, card_content_new)
+        self.assertEqual(self.client.skipped_edits(), skipped + 1)
+
+        async with Markji(self.token, card_cache_size=100) as client:
+            # cached by a read, then changed by another client
+            await client.get_card(deck.id, card.id)
+            await self.client.edit_card(deck.id, card.id, card_content)
+            result = await client.edit_card(deck.id, card.id, card_content_new)
+            self.assertEqual(result.content, card_content_new)
+            self.assertEqual(client.skipped_edits(), 0)
+
+            # cached by its own write
+            await client.edit_card(deck.id, card.id, card_content_new)
+            self.assertEqual(client.skipped_edits(), 1)
+
     async def test_sort(self):
         folder_name = "t_folder"
         folder = await self.client.new_folder(folder_name)
@@ -161,6 +336,56 @@ class TestCard(AsyncTestCase):
         self.assertEqual(chapter_diff.new_chapter.card_ids, card_ids1)
         self.assertEqual(chapter_diff.old_chapter.card_ids, card_ids2)
 
+    async def test_move_bulk(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+
+        chapters = []
+        card_ids = []
+        for i in range(3):
+            chapter = await self.client.new_chapter(deck.id, f"t_chapter_{i}")
+            cards, _ = await self.client.new_cards(
+                deck.id, chapter.id, [f"t_card_{i}_{j}" for j in range(2)]
+            )
+            chapters.append(chapter)
+            card_ids.append([cast(Card, card).id for card in cards])
+
+        result, errors = await self.client.move_cards_bulk(
+            deck.id,
+            [
+                (card_ids[0][0], chapters[0].id, chapters[2].id),
+                (card_ids[1][1], chapters[1].id, chapters[2].id),
+                (card_ids[2][0], chapters[2].id, chapters[0].id),
+                (card_ids[0][1], chapters[0].id, chapters[2].id),
+            ],
+            concurrency=2,
+        )
+
+        self.assertListEqual(result[chapters[0].id].card_ids, [card_ids[2][0]])
+        self.assertListEqual(result[chapters[1].id].card_ids, [card_ids[1][0]])
+        self.assertListEqual(
+            result[chapters[2].id].card_ids,
+            [card_ids[2][1], card_ids[0][0], card_ids[0][1], card_ids[1][1]],
+        )
+        self.assertEqual(errors, [None] * 4)
+
+        # a failed group keeps the state of the others
+        result, errors = await self.client.move_cards_bulk(
+            deck.id,
+            [
+                (card_ids[2][0], chapters[0].id, chapters[1].id),
+                (card_ids[2][0], chapters[2].id, chapters[1].id),
+            ],
+        )
+
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[1], ClientResponseError)
+        self.assertListEqual(result[chapters[0].id].card_ids, [])
+
     async def test_search(self):
         keyword = "english"
         cards1, num1 = await self.client.search_cards(keyword)
@@ -188,6 +413,37 @@ class TestCard(AsyncTestCase):
 
         self.assertTrue(len(cards) > 0)
 
+    async def test_iter_search(self):
+        keyword = "english"
+        cards, total = await self.client.search_cards(keyword, limit=20)
+
+        results = []
+        async for result in self.client.iter_search_cards(keyword, limit=10):
+            results.append(result)
+            if len(results) == 20:
+                break
+
+        self.assertListEqual(
+            [card.id for card, _, _ in results], [card.id for card in cards]
+        )
+        self.assertEqual(results[-1][1], total)
+
+        cards, total = await self.client.search_cards(keyword, offset=990, limit=100)
+        results = [
+            result
+            async for result in self.client.iter_search_cards(
+                keyword, offset=990, limit=100
+            )
+        ]
+
+        self.assertEqual(len(results), len(cards))
+        self.assertTrue(len(results) < total)
+        self.assertTrue(results[-1][2])
+
+        with self.assertRaises(ValueError):
+            async for _ in self.client.iter_search_cards(keyword, limit=9):
+                pass
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -138,6 +138,36 @@ class TestChapter(AsyncTestCase):
 
         self.assertListEqual(chapter_set.chapter_ids, chapter_ids)
 
+    async def test_sort_rebase(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+
+        chapter_name1 = "t_chapter1"
+        chapter1 = await self.client.new_chapter(deck.id, chapter_name1)
+        chapter_set = await self.client.get_chapter_set(deck.id)
+        chapter_ids = chapter_set.chapter_ids[::-1]
+
+        # changed by another writer after the revision was read
+        chapter_name2 = "t_chapter2"
+        chapter2 = await self.client.new_chapter(deck.id, chapter_name2)
+        chapter_set = await self.client.sort_chapters(
+            deck.id, chapter_ids, chapter_set.revision
+        )
+
+        self.assertListEqual(
+            chapter_set.chapter_ids, [chapter1.id, chapter2.id] + chapter_ids[1:]
+        )
+
+        # rejected for an unknown ID, the order is not rewritten
+        with self.assertRaises(ClientResponseError):
+            await self.client.sort_chapters(
+                deck.id, chapter_set.chapter_ids + ["t_chapter"], chapter_set.revision
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,354 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import time
+import unittest
+from typing import cast
+from unittest.mock import patch
+
+from aiohttp import ClientResponseError, ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from markji import Markji
+from markji._limiter import _RateLimiter
+from markji._state import _Entry
+from markji.retry import RetryPolicy
+from tests import AsyncTestCase
+
+
+class TestClient(AsyncTestCase):
+    async def test_session(self):
+        async with Markji(self.token) as client:
+            await client.get_profile()
+            session = client._session()
+            await client.get_profile()
+
+            self.assertIs(client._session(), session)
+
+        self.assertTrue(session.closed)
+
+    async def test_session_loop(self):
+        client = Markji(self.token)
+        await asyncio.to_thread(asyncio.run, client.get_profile())
+        session = client._client_session
+        self.assertIsNotNone(session)
+
+        # the first loop ended without closing the client
+        with self.assertWarns(ResourceWarning):
+            await client.get_profile()
+        await asyncio.sleep(0)
+
+        self.assertIsNot(client._session(), session)
+        self.assertTrue(cast(ClientSession, session).closed)
+
+        await client.close()
+
+    async def test_close(self):
+        client = Markji(self.token)
+        await client.get_profile()
+        await client.close()
+
+        await client.get_profile()
+        await client.close()
+
+    async def test_options(self):
+        async with Markji(
+            self.token, limit=10, limit_per_host=5, total_timeout=30
+        ) as client:
+            await client.get_profile()
+            session = client._session()
+
+            self.assertEqual(session.timeout.total, 30)
+            self.assertEqual(session.timeout.sock_connect, 30)
+
+        with self.assertRaises(ValueError):
+            Markji(self.token, limit=-1)
+
+        with self.assertRaises(ValueError):
+            Markji(self.token, total_timeout=0)
+
+    async def test_rate_limit(self):
+        async with Markji(self.token, rate_limit=5, rate_burst=1) as client:
+            start = time.monotonic()
+            # sequential, identical concurrent reads would be coalesced
+            for _ in range(5):
+                await client.get_profile()
+
+            self.assertGreaterEqual(time.monotonic() - start, 0.8)
+
+        # a burst of throttled responses escalates only once
+        limiter = _RateLimiter(10, 1)
+        sent = await limiter.acquire()
+        for _ in range(8):
+            limiter.throttle(sent)
+
+        self.assertEqual(limiter.rate, 5)
+        self.assertLessEqual(limiter._paused_until - time.monotonic(), 1)
+
+        with self.assertRaises(ValueError):
+            Markji(self.token, rate_limit=0)
+
+        with self.assertRaises(ValueError):
+            Markji(self.token, rate_burst=0)
+
+    async def test_retry(self):
+        async with Markji(self.token, retry=RetryPolicy(max_attempts=2)) as client:
+            await client.get_profile()
+
+        async with Markji(self.token, retry=None) as client:
+            await client.get_profile()
+
+        # a server failing every request with 500
+        methods = []
+
+        async def handler(request: web.Request) -> web.Response:
+            methods.append(request.method)
+            return web.Response(status=500)
+
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", handler)
+        async with TestServer(app) as server:
+            with patch("markji._API_URL", str(server.make_url("/"))):
+                async with Markji(
+                    self.token, retry=RetryPolicy(max_attempts=3, base_delay=0)
+                ) as client:
+                    # idempotent requests are retried
+                    with self.assertRaises(ClientResponseError):
+                        await client.get_profile()
+                    self.assertEqual(methods, ["GET"] * 3)
+
+                    # the others may have been processed and are not
+                    methods.clear()
+                    with self.assertRaises(ClientResponseError):
+                        await client.new_deck("t_folder", "t_deck")
+                    self.assertEqual(methods, ["POST"])
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+    async def test_coalesce(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+
+        async with Markji(self.token) as client:
+            with patch.object(client, "_send", wraps=client._send) as send:
+                decks = await asyncio.gather(
+                    *(client.get_deck(deck.id) for _ in range(10))
+                )
+
+                self.assertEqual(send.await_count, 1)
+
+            for _deck in decks:
+                self.assertEqual(_deck, decks[0])
+            self.assertEqual(len(client._inflight), 0)
+
+    async def test_cache(self):
+        async with Markji(self.token, cache_size=100) as client:
+            folder_name = "t_folder"
+            folder = await client.new_folder(folder_name)
+            self.addCleanup(self.client.delete_folder, folder.id)
+
+            folder = await client.get_folder(folder.id)
+            self.assertEqual(len(client._cache), 1)
+
+            folder_name = "t_folder_new"
+            await client.rename_folder(folder.id, folder_name)
+            self.assertEqual(len(client._cache), 0)
+
+            folder = await client.get_folder(folder.id)
+            self.assertEqual(folder.name, folder_name)
+
+            client.clear_cache()
+            self.assertEqual(len(client._cache), 0)
+
+        with self.assertRaises(ValueError):
+            Markji(self.token, cache_size=-1)
+
+    async def test_card_cache(self):
+        async with Markji(self.token, card_cache_size=100) as client:
+            folder_name = "t_folder"
+            folder = await client.new_folder(folder_name)
+            self.addCleanup(self.client.delete_folder, folder.id)
+            deck_name = "t_deck"
+            deck = await client.new_deck(folder.id, deck_name)
+            self.addCleanup(self.client.delete_deck, deck.id)
+            chapter = (await client.list_chapters(deck.id))[0]
+
+            card_1 = await client.new_card(deck.id, chapter.id, "t_card_1")
+            card_2 = await client.new_card(deck.id, chapter.id, "t_card_2")
+            self.assertEqual(len(client._cards), 2)
+
+            card_2 = await client.edit_card(deck.id, card_2.id, "t_card_2_new")
+            cards = await client.list_cards(deck.id, chapter.id)
+            self.assertEqual(cards, [card_1, card_2])
+
+            await client.delete_card(chapter.id, deck.id, card_1.id)
+            self.assertEqual(len(client._cards), 1)
+
+            client.clear_cache()
+            cards = await client.list_cards(deck.id, chapter.id)
+            self.assertEqual([card.content for card in cards], ["t_card_2_new"])
+
+        with self.assertRaises(ValueError):
+            Markji(self.token, card_cache_size=-1)
+
+    async def test_track_state(self):
+        async with Markji(self.token, track_state=True) as client:
+            folder_name = "t_folder"
+            folder = await client.new_folder(folder_name)
+            self.addCleanup(self.client.delete_folder, folder.id)
+            deck_name = "t_deck"
+            deck = await client.new_deck(folder.id, deck_name)
+            self.addCleanup(self.client.delete_deck, deck.id)
+            chapter = (await client.list_chapters(deck.id))[0]
+
+            card_1 = await client.new_card(deck.id, chapter.id, "t_card_1")
+            card_2 = await client.new_card(deck.id, chapter.id, "t_card_2")
+            entry = client._state.chapter(deck.id, chapter.id)
+            self.assertIsNotNone(entry)
+            entry = cast(_Entry, entry)
+            self.assertEqual(entry.ids, [card_1.id, card_2.id])
+
+            chapter = await client.sort_cards(
+                deck.id, chapter.id, [card_2.id, card_1.id]
+            )
+            self.assertEqual(
+                client._state.chapter_revision(deck.id, chapter.id), chapter.revision
+            )
+
+            chapter = await client.sort_cards(
+                deck.id, chapter.id, [card_1.id, card_2.id]
+            )
+            self.assertEqual(chapter.card_ids, [card_1.id, card_2.id])
+
+            await self.client.sort_cards(deck.id, chapter.id, [card_2.id, card_1.id])
+            chapter = await client.sort_cards(
+                deck.id, chapter.id, [card_1.id, card_2.id]
+            )
+            self.assertEqual(chapter.card_ids, [card_1.id, card_2.id])
+
+    async def test_json(self):
+        calls = []
+
+        def loads(s: str):
+            calls.append("loads")
+            return json.loads(s)
+
+        def dumps(obj) -> str:
+            calls.append("dumps")
+            return json.dumps(obj)
+
+        async with Markji(self.token, loads=loads, dumps=dumps) as client:
+            folder_name = "t_folder"
+            folder = await client.new_folder(folder_name)
+            self.addCleanup(self.client.delete_folder, folder.id)
+
+            self.assertIn("loads", calls)
+            self.assertIn("dumps", calls)
+            self.assertEqual(folder.name, folder_name)
+
+    async def test_export(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+        chapter_name = "t_chapter"
+        chapter = await self.client.new_chapter(deck.id, chapter_name)
+        card_content = "t_card"
+        card = await self.client.new_card(deck.id, chapter.id, card_content)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "account.jsonl.gz")
+            count = await self.client.export_account(path)
+
+            with gzip.open(path) as file:
+                records = [json.loads(line) for line in file]
+
+            with self.assertRaises(ValueError):
+                await self.client.export_account(os.path.join(directory, "a.jsonl"))
+
+        self.assertEqual(count, len(records))
+        ids = {
+            (record["type"], record["parent_id"], record["data"]["id"])
+            for record in records
+        }
+        self.assertIn(("folder", folder.parent_id, folder.id), ids)
+        self.assertIn(("deck", folder.id, deck.id), ids)
+        self.assertIn(("chapter", deck.id, chapter.id), ids)
+        self.assertIn(("card", chapter.id, card.id), ids)
+
+    async def test_sync_account(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+        chapter_name = "t_chapter"
+        chapter = await self.client.new_chapter(deck.id, chapter_name)
+
+        with tempfile.TemporaryDirectory() as directory:
+            state_file = os.path.join(directory, "state.json")
+            await self.client.export_account(
+                os.path.join(directory, "account.jsonl.gz"), state_file=state_file
+            )
+
+            card_content = "t_card"
+            card = await self.client.new_card(deck.id, chapter.id, card_content)
+            path = os.path.join(directory, "changes.jsonl.gz")
+            await self.client.sync_account(state_file, path)
+
+            with gzip.open(path) as file:
+                records = [json.loads(line) for line in file]
+
+        ids = {(record["type"], record["id"]) for record in records}
+        self.assertIn(("deck", deck.id), ids)
+        self.assertIn(("chapter", chapter.id), ids)
+        self.assertIn(("card", card.id), ids)
+
+    async def test_sync_records(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+        chapter_name = "t_chapter"
+        chapter = await self.client.new_chapter(deck.id, chapter_name)
+
+        records = []
+
+        async def write(record: dict):
+            records.append(record)
+
+        state = await self.client.sync_records(write)
+        self.assertIn(("deck", deck.id), {(r["type"], r["id"]) for r in records})
+
+        records.clear()
+        card_content = "t_card"
+        card = await self.client.new_card(deck.id, chapter.id, card_content)
+        await self.client.sync_records(write, state)
+
+        ids = {(record["type"], record["id"]) for record in records}
+        self.assertIn(("chapter", chapter.id), ids)
+        self.assertIn(("card", card.id), ids)
+
+        with self.assertRaises(ValueError):
+            await self.client.sync_records(write, concurrency=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ from typing import cast
 
 from aiohttp import ClientResponseError
 
+from markji.reconcile import ChapterLayout
 from markji.types import (
     DeckAccessSetting,
     DeckAccessSettingBrief,
@@ -383,6 +384,22 @@ class TestDeck(AsyncTestCase):
         with self.assertRaises(ValueError):
             await self.client.search_decks("english", limit=101)
 
+    async def test_iter_search(self):
+        decks, _ = await self.client.search_decks("english", limit=25)
+
+        deck_ids = [
+            deck.id
+            async for deck, _, _ in self.client.iter_search_decks(
+                "english", limit=10, count=25
+            )
+        ]
+
+        self.assertListEqual(deck_ids, [deck.id for deck in decks])
+
+        with self.assertRaises(ValueError):
+            async for _ in self.client.iter_search_decks("english", offset=1001):
+                pass
+
     async def test_fork(self):
         decks, _ = await self.client.search_decks("english")
         deck = decks[0]
@@ -414,6 +431,51 @@ class TestDeck(AsyncTestCase):
         link = await self.client.get_deck_access_link(deck.id)
         self.assertTrue(link.startswith(f"https://www.markji.com/deck/{deck.id}"))
 
+    async def test_reconcile(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+
+        layouts = [
+            [
+                ChapterLayout("t_chapter1", ["t_card_1", "t_card_2", "t_card_3"]),
+                ChapterLayout("t_chapter2", ["t_card_4"]),
+            ],
+            [
+                ChapterLayout("t_chapter2", ["t_card_4", "t_card_1"]),
+                ChapterLayout("t_chapter3", ["t_card_3", "t_card_5"]),
+            ],
+        ]
+        for layout in layouts:
+            # chunks smaller than a chapter
+            await self.client.reconcile_deck(
+                deck.id, layout, concurrency=2, chunk_size=2
+            )
+
+            chapter_set = await self.client.get_chapter_set(deck.id)
+            chapters = {
+                chapter.id: chapter
+                for chapter in await self.client.list_chapters(deck.id)
+            }
+            result = []
+            for chapter_id in chapter_set.chapter_ids:
+                cards = await self.client.list_cards(deck.id, chapter_id)
+                result.append(
+                    ChapterLayout(
+                        chapters[chapter_id].name, [card.content for card in cards]
+                    )
+                )
+            self.assertListEqual(result, layout)
+
+        plan = await self.client.plan_deck(deck.id, layouts[-1])
+        self.assertEqual(len(plan), 0)
+
+        with self.assertRaises(ValueError):
+            await self.client.reconcile_deck(deck.id, layouts[-1], chunk_size=0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,9 +4,12 @@
 # :license: MIT, see LICENSE for more details.
 
 import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
 
 from aiohttp import ClientResponseError
 
+from markji import Markji
 from markji.types.folder import Folder, RootFolder
 from tests import AsyncTestCase
 
@@ -97,6 +100,22 @@ class TestFolder(AsyncTestCase):
 
         self.assertEqual([i.object_id for i in root_folder.items], folder_ids)
 
+        # a known update time in another time zone, without reading the root folder
+        folder_ids = [folder1.id, folder2.id] + existed_folder_ids
+        updated_time = root_folder.updated_time.astimezone(timezone(timedelta(hours=8)))
+        async with Markji(self.token) as client:
+            with patch.object(client, "get_root_folder") as get_root_folder:
+                root_folder = await client.sort_folders(
+                    folder_ids, updated_time, root_folder.id
+                )
+
+                get_root_folder.assert_not_called()
+
+        self.assertEqual([i.object_id for i in root_folder.items], folder_ids)
+
+        with self.assertRaises(ValueError):
+            await self.client.sort_folders(folder_ids, datetime(2025, 1, 1))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,55 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+import unittest
+from typing import cast
+
+from markji.mirror import Mirror
+from markji.types.card import Card
+from markji.types.deck import DeckInfo
+from tests import AsyncTestCase
+
+
+class TestMirror(AsyncTestCase):
+    async def test_sync(self):
+        folder_name = "t_folder"
+        folder = await self.client.new_folder(folder_name)
+        self.addCleanup(self.client.delete_folder, folder.id)
+        deck_name = "t_deck"
+        deck = await self.client.new_deck(folder.id, deck_name)
+        self.addCleanup(self.client.delete_deck, deck.id)
+        chapter_name = "t_chapter"
+        chapter = await self.client.new_chapter(deck.id, chapter_name)
+        card_content = "t_card"
+        card = await self.client.new_card(deck.id, chapter.id, card_content)
+
+        with Mirror() as mirror:
+            await mirror.sync(self.client)
+
+            _deck = mirror.get_deck(deck.id)
+            self.assertIsNotNone(_deck)
+            self.assertEqual(cast(DeckInfo, _deck).name, deck_name)
+            self.assertIn(deck.id, [deck.id for deck in mirror.list_decks(folder.id)])
+            self.assertIn(
+                chapter.id, [chapter.id for chapter in mirror.list_chapters(deck.id)]
+            )
+            _card = mirror.get_card(card.id)
+            self.assertIsNotNone(_card)
+            self.assertEqual(cast(Card, _card).content, card_content)
+            self.assertEqual(
+                [card.id for card in mirror.list_cards(chapter.id)], [card.id]
+            )
+            self.assertIn(
+                card.id, [card.id for card in mirror.find_cards(card.root_id)]
+            )
+
+            await self.client.delete_card(chapter.id, deck.id, card.id)
+            await mirror.sync(self.client)
+
+            self.assertIsNone(mirror.get_card(card.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# :project: markji-py
+# :author: L-ING
+# :copyright: (C) 2025 L-ING <hlf01@icloud.com>
+# :license: MIT, see LICENSE for more details.
+
+import ast
+import inspect
+import os
+import unittest
+from typing import cast
+
+import markji.sync
+from markji.sync import Markji
+from tests import AsyncTestCase
+
+
+class TestSync(AsyncTestCase):
+    def test_call(self):
+        with Markji(self.token) as client:
+            folder_name = "t_folder"
+            folder = client.new_folder(folder_name)
+            self.addCleanup(self.client.delete_folder, folder.id)
+
+            folder = client.get_folder(folder.id)
+            self.assertEqual(folder.name, folder_name)
+
+    def test_submit(self):
+        with Markji(self.token) as client:
+            folder_name = "t_folder"
+            folder = client.new_folder(folder_name)
+            self.addCleanup(self.client.delete_folder, folder.id)
+
+            futures = [client.submit("get_folder", folder.id) for _ in range(5)]
+            for future in futures:
+                self.assertEqual(future.result().name, folder_name)
+
+            with self.assertRaises(AttributeError):
+                client.submit("clear_cache")
+
+    def test_close(self):
+        client = Markji(self.token)
+        client.get_profile()
+        client.close()
+        self.assertFalse(client._thread.is_alive())
+        client.close()
+
+    def test_stub(self):
+        # every wrapped method is declared for type checkers
+        path = os.path.splitext(cast(str, markji.sync.__file__))[0] + ".pyi"
+        with open(path, encoding="utf-8") as file:
+            tree = ast.parse(file.read())
+        stub = next(
+            node
+            for node in tree.body
+            if isinstance(node, ast.ClassDef) and node.name == "Markji"
+        )
+        declared = {
+            node.name for node in stub.body if isinstance(node, ast.FunctionDef)
+        }
+
+        for name, _ in inspect.getmembers(Markji, inspect.isfunction):
+            if not name.startswith("_"):
+                self.assertIn(name, declared)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -52,6 +52,22 @@ class TestUser(AsyncTestCase):
         with self.assertRaises(ValueError):
             await self.client.search_users(profile.nickname, offset=9990, limit=11)
 
+    async def test_iter_search(self):
+        profile = await self.client.get_profile()
+        users = [
+            user async for user, _, _ in self.client.iter_search_users(profile.nickname)
+        ]
+
+        self.assertEqual(len(users), 1)
+        self.assertEqual(users[0].id, profile.id)
+
+        with self.assertRaises(ValueError):
+            async for _ in self.client.iter_search_users(profile.nickname, limit=0):
+                pass
+        with self.assertRaises(ValueError):
+            async for _ in self.client.iter_search_users(profile.nickname, count=0):
+                pass
+
     async def test_search_collaborators(self):
         folder_name = "t_folder"
         folder = await self.client.new_folder(folder_name)